@@ -0,0 +1,93 @@
+from datetime import date
+from pathlib import Path
+
+# Corpus-wide experience analytics over the Parquet tables written by
+# export.py, computed on whole columns with pandas instead of per profile:
+#   tenure       months per profile and company, and per profile overall
+#   overlaps     pairs of roles at different companies held at the same time
+#   transitions  moves from one company to the next, counted across profiles
+# Months are counted the way LinkedIn shows them, both end months included.
+# Needs pandas and pyarrow.
+
+
+def month_index(values, today=None):
+    # "Mon YYYY", "YYYY" or "Present" to months since year 0; None if unknown
+    import numpy as np
+    import pandas as pd
+
+    today = today or date.today()
+    values = values.astype("string").str.strip()
+    with_month = pd.to_datetime(values, format="%b %Y", errors="coerce")
+    year_only = pd.to_datetime(values, format="%Y", errors="coerce")
+    parsed = with_month.fillna(year_only)
+    months = parsed.dt.year * 12 + parsed.dt.month - 1
+    # A missing value compares as NA, which must not count as "Present"
+    present = values.str.lower().eq("present").fillna(False).astype(bool)
+    months = months.mask(present, today.year * 12 + today.month - 1)
+    return months.astype("float64").to_numpy(na_value=np.nan)
+
+
+def load_roles(input_dir):
+    import pandas as pd
+
+    roles = pd.read_parquet(Path(input_dir) / "experience_roles.parquet")
+    roles["start"] = month_index(roles["start_date"])
+    roles["end"] = month_index(roles["end_date"])
+    # A role without an end date is only known to have started
+    roles["end"] = roles["end"].fillna(roles["start"])
+    roles = roles.dropna(subset=["start"])
+    roles["months"] = roles["end"] - roles["start"] + 1
+    return roles
+
+
+def tenure(roles):
+    by_company = roles.groupby(["profile_id", "company"], dropna=False).agg(
+        start=("start", "min"), end=("end", "max"), roles=("role", "size"), months=("months", "sum")
+    ).reset_index()
+    by_profile = roles.groupby("profile_id").agg(
+        start=("start", "min"), end=("end", "max"), companies=("company", "nunique"), months=("months", "sum")
+    ).reset_index()
+    by_profile["span_months"] = by_profile["end"] - by_profile["start"] + 1
+    return by_company, by_profile
+
+
+def overlaps(roles):
+    keep = ["profile_id", "position", "role", "company", "title", "start", "end"]
+    pairs = roles[keep].merge(roles[keep], on="profile_id", suffixes=("_a", "_b"))
+    pairs = pairs[
+        (pairs["position_a"] < pairs["position_b"])
+        & (pairs["start_a"] <= pairs["end_b"])
+        & (pairs["start_b"] <= pairs["end_a"])
+    ]
+    pairs = pairs.assign(
+        months=pairs[["end_a", "end_b"]].min(axis=1) - pairs[["start_a", "start_b"]].max(axis=1) + 1
+    )
+    return pairs.reset_index(drop=True)
+
+
+def transitions(roles):
+    stints = roles.groupby(["profile_id", "position"]).agg(
+        company=("company", "first"), start=("start", "min")
+    ).reset_index().sort_values(["profile_id", "start"])
+    stints["next_company"] = stints.groupby("profile_id")["company"].shift(-1)
+    moves = stints.dropna(subset=["next_company"])
+    moves = moves[moves["company"] != moves["next_company"]]
+    return moves.groupby(["company", "next_company"]).size().rename("count").reset_index().sort_values(
+        "count", ascending=False, ignore_index=True
+    )
+
+
+def analyze(input_dir, output_dir=None):
+    roles = load_roles(input_dir)
+    by_company, by_profile = tenure(roles)
+    results = {
+        "tenure_by_company": by_company,
+        "tenure_by_profile": by_profile,
+        "overlaps": overlaps(roles),
+        "transitions": transitions(roles)
+    }
+    if output_dir:
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+        for name, frame in results.items():
+            frame.to_parquet(Path(output_dir) / f"{name}.parquet", index=False)
+    return results
@@ -0,0 +1,117 @@
+import calendar
+import json
+import re
+from pathlib import Path
+from sections import load
+
+# The profile pages are rendered from Voyager API responses the browser
+# already receives. Each section module may define decode(profile, entities,
+# index) to build its output from the entities in those responses; sections
+# without a decoder, or whose entities are missing, fall back to the DOM.
+
+API_URL = re.compile(r"/voyager/api/")
+
+
+def is_api_response(response):
+    if not API_URL.search(response.url):
+        return False
+    return "json" in response.headers.get("content-type", "")
+
+
+def read_payloads(responses):
+    payloads = []
+    for response in responses:
+        if not is_api_response(response):
+            continue
+        try:
+            payloads.append(response.json())
+        except Exception:
+            pass
+    return payloads
+
+
+async def read_payloads_async(responses):
+    payloads = []
+    for response in responses:
+        if not is_api_response(response):
+            continue
+        try:
+            payloads.append(await response.json())
+        except Exception:
+            pass
+    return payloads
+
+
+def fixture_path(output_dir, profile, section):
+    return Path(output_dir) / f"{profile}.{section}.api.json"
+
+
+def write_fixture(output_dir, profile, section, payloads):
+    with open(fixture_path(output_dir, profile, section), "w", encoding="utf-8") as f:
+        json.dump(payloads, f)
+
+
+def read_fixture(output_dir, profile, section):
+    with open(fixture_path(output_dir, profile, section), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def collect_entities(payloads):
+    # Normalized responses list records under "included", plain ones nest
+    # them under "data" or "elements"; any dict with a $type is a record
+    entities = {}
+    stack = [payloads]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if "$type" in node:
+                entities.setdefault(node.get("entityUrn") or id(node), node)
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+    return list(entities.values())
+
+
+def type_name(entity):
+    return entity.get("$type", "").rsplit(".", 1)[-1]
+
+
+def by_type(entities, *names):
+    return [e for e in entities if type_name(e) in names]
+
+
+def ref(entity, key, index):
+    # Nested record, or a "*key" URN pointing into the included records
+    value = entity.get(key)
+    if isinstance(value, dict):
+        return value
+    return index.get(entity.get(f"*{key}")) or {}
+
+
+def month_year(date):
+    if not date or not date.get("year"):
+        return None
+    month = date.get("month")
+    return f"{calendar.month_abbr[month]} {date['year']}" if month else str(date["year"])
+
+
+def full_date(date):
+    if not date or not date.get("year"):
+        return None
+    if not date.get("day"):
+        return month_year(date)
+    return f"{calendar.month_abbr[date['month']]} {date['day']}, {date['year']}"
+
+
+def date_range(entity):
+    period = entity.get("dateRange") or entity.get("timePeriod") or {}
+    return period.get("start") or period.get("startDate"), period.get("end") or period.get("endDate")
+
+
+def decode(section, profile, payloads):
+    decoder = getattr(load(section), "decode", None)
+    if not decoder or not payloads:
+        return None
+    entities = collect_entities(payloads)
+    index = {e["entityUrn"]: e for e in entities if "entityUrn" in e}
+    return decoder(profile, entities, index) or None
@@ -0,0 +1,255 @@
+import argparse
+import random
+import re
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Synthetic profile pages with the markup the section parsers expect, for
+# load testing without touching linkedin.com. Pages are generated from a seed
+# derived from the profile ID, so the same ID always renders the same page.
+
+PROFILE_PATH = re.compile(r"^/in/([^/]+)/?$")
+DETAILS_PATH = re.compile(r"^/in/([^/]+)/details/([^/]+)/?$")
+MEDIA_PATH = re.compile(r"^/media/")
+
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+WORDS = ["data", "platform", "cloud", "systems", "search", "growth", "payments", "security", "mobile", "infra"]
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark", "Wayne", "Tyrell", "Cyberdyne", "Wonka"]
+TITLES = ["Engineer", "Senior Engineer", "Staff Engineer", "Manager", "Director", "Architect", "Analyst"]
+
+SECTIONS = ["experience", "education", "certifications", "skills", "recommendations", "publications", "patents"]
+
+
+def span(text):
+    return f'<span aria-hidden="true"><!---->{text}<!----></span><span class="visually-hidden"><!---->{text}<!----></span>'
+
+
+def sentence(rng, words=12):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def logo(rng):
+    return f'<img class="ivm-view-attr__img--centered" src="/media/logo-{rng.randrange(1000)}.png" alt="">'
+
+
+def item(inner, rng):
+    return (
+        '<li class="pvs-list__paged-list-item artdeco-list__item pvs-list__item--line-separated">'
+        f'<div class="display-flex">{logo(rng)}<div class="display-flex flex-column full-width">{inner}</div></div></li>'
+    )
+
+
+def date_range(rng):
+    start_year = rng.randrange(1970, 2018)
+    start = f"{rng.choice(MONTHS)} {start_year}"
+    years = rng.randrange(0, 6)
+    months = rng.randrange(1, 12)
+    end = "Present" if rng.random() < 0.2 else f"{rng.choice(MONTHS)} {start_year + years}"
+    return f"{start} - {end} · {years} yrs {months} mos" if years else f"{start} - {end} · {months} mos"
+
+
+def caption(text):
+    return f'<span class="t-14 t-normal t-black--light"><span class="pvs-entity__caption-wrapper" aria-hidden="true">{text}</span></span>'
+
+
+def experience_item(rng, i):
+    if rng.random() < 0.25:
+        roles = "".join(
+            '<li class="pvs-list__item--one-column">'
+            f'<div class="display-flex t-bold">{span(rng.choice(TITLES))}</div>'
+            f'{caption(date_range(rng))}'
+            f'<div class="t-14 t-normal t-black">{span(sentence(rng))}</div></li>'
+            for r in range(rng.randrange(2, 4))
+        )
+        return item(f'<div class="display-flex t-bold">{span(rng.choice(COMPANIES))}</div><ul>{roles}</ul>', rng)
+    return item(
+        f'<div class="display-flex hoverable-link-text t-bold">{span(rng.choice(TITLES))}</div>'
+        f'<span class="t-14 t-normal">{span(rng.choice(COMPANIES) + " · Full-time")}</span>'
+        f'{caption(date_range(rng))}'
+        f'<div class="t-14 t-normal t-black">{span(sentence(rng, 30))}</div>',
+        rng
+    )
+
+
+def education_item(rng, i):
+    year = rng.randrange(1970, 2016)
+    return item(
+        f'<div class="display-flex t-bold">{span(rng.choice(WORDS).capitalize() + " University")}</div>'
+        f'<span class="t-14 t-normal">{span("BSc, " + rng.choice(WORDS).capitalize())}</span>'
+        f'{caption(f"{year} - {year + 4}")}'
+        f'<div class="t-14 t-normal t-black">{span(sentence(rng))}'
+        f'<div><span>Activities and societies: {rng.choice(WORDS)} club</span></div></div>',
+        rng
+    )
+
+
+def certification_item(rng, i):
+    return item(
+        f'<div class="display-flex t-bold">{span(rng.choice(WORDS).capitalize() + " Certified")}</div>'
+        f'<span class="t-14 t-normal">{span(rng.choice(COMPANIES))}</span>'
+        f'{caption("Issued " + rng.choice(MONTHS) + " " + str(rng.randrange(1990, 2024)))}'
+        f'<span class="t-14 t-normal t-black"><span aria-hidden="true">Credential ID {rng.randrange(10 ** 8)}</span></span>'
+        f'<a href="https://www.credly.com/badges/{rng.randrange(10 ** 8)}">Show credential</a>'
+        f'{span("Skills: " + " · ".join(rng.sample(WORDS, 3)))}',
+        rng
+    )
+
+
+def skill_item(rng, i):
+    name = f"{rng.choice(WORDS).capitalize()} {i}"
+    return item(
+        f'<a data-field="skill_page_skill_topic" href="/search/results/all/?keywords={name}">'
+        f'<div class="display-flex t-bold">{span(name)}</div></a>'
+        f'{span(str(rng.randrange(1, 99)) + " endorsements")}'
+        f'{span("Endorsed by " + rng.choice(COMPANIES) + " Person who is highly skilled at this")}'
+        f'{span(str(rng.randrange(1, 5)) + " experiences across " + rng.choice(COMPANIES))}',
+        rng
+    )
+
+
+def recommendation_item(rng, i):
+    who = f"{rng.choice(COMPANIES)}-person-{i}"
+    return item(
+        f'<a class="optional-action-target-wrapper display-flex" href="https://www.linkedin.com/in/{who.lower()}/">'
+        f'{span(who.replace("-", " "))}</a>'
+        f'<span class="t-14 t-normal">{span("· 2nd")}</span>'
+        f'<span class="t-14 t-normal">{span(rng.choice(TITLES) + " at " + rng.choice(COMPANIES))}</span>'
+        f'<span class="pvs-entity__caption-wrapper" aria-hidden="true">{rng.choice(MONTHS)} {rng.randrange(1, 28)}, {rng.randrange(2005, 2024)}, worked together</span>'
+        f'<div class="t-14 t-normal t-black">{span(sentence(rng, 40))}</div>',
+        rng
+    )
+
+
+def publication_item(rng, i):
+    return item(
+        f'<div class="display-flex t-bold">{span(sentence(rng, 6))}</div>'
+        f'<span class="t-14 t-normal">{span("IEEE · " + rng.choice(MONTHS) + " 1, " + str(rng.randrange(1990, 2024)))}</span>'
+        f'<a href="https://doi.org/10.{rng.randrange(10 ** 6)}">Show publication</a>'
+        f'<div class="t-14 t-normal t-black">{span(sentence(rng, 25))}</div>',
+        rng
+    )
+
+
+def patent_item(rng, i):
+    return item(
+        f'<div class="display-flex t-bold">{span(sentence(rng, 5))}</div>'
+        f'<span class="t-14 t-normal">{span("US " + str(rng.randrange(10 ** 7)) + " · Issued " + rng.choice(MONTHS) + " 5, " + str(rng.randrange(1990, 2024)))}</span>'
+        f'<div class="t-14 t-normal t-black">{span(sentence(rng, 25))}</div>',
+        rng
+    )
+
+
+ITEMS = {
+    "experience": experience_item,
+    "education": education_item,
+    "certifications": certification_item,
+    "skills": skill_item,
+    "recommendations": recommendation_item,
+    "publications": publication_item,
+    "patents": patent_item
+}
+
+
+def rng_for(profile, section):
+    return random.Random(f"{profile}/{section}")
+
+
+def render_section_html(profile, section, entries):
+    # Inner HTML of <main>, i.e. what the parsers receive for a details page
+    rng = rng_for(profile, section)
+    if not entries:
+        return '<section><div class="artdeco-empty-state"><h2>Nothing to see for now</h2></div></section>'
+    items = "".join(ITEMS[section](rng, i) for i in range(entries))
+    return f'<section class="artdeco-card"><div class="pvs-list__container"><ul class="pvs-list">{items}</ul></div></section>'
+
+
+def render_main(profile):
+    rng = rng_for(profile, "main")
+    name = profile.replace("-", " ").title()
+    about = "<br>".join(sentence(rng, 20) for _ in range(4))
+    return (
+        f'<!DOCTYPE html><html><head><title>{name} | LinkedIn</title></head><body>'
+        f'<img src="/media/banner-{profile}.jpg" alt=""><img src="/media/avatar-{profile}.jpg" alt="">'
+        f'<main><section class="artdeco-card"><h1 class="text-heading-xlarge">{name}</h1>'
+        f'<div class="text-body-medium break-words">{rng.choice(TITLES)} at {rng.choice(COMPANIES)}</div>'
+        f'<ul><li><span aria-hidden="true">{rng.randrange(100, 10000):,} followers</span></li></ul></section>'
+        f'<section class="artdeco-card"><div class="inline-show-more-text full-width">'
+        f'<span aria-hidden="true"><!---->{about}<!----></span></div></section></main></body></html>'
+    )
+
+
+def render_details(profile, section, entries):
+    return (
+        f'<!DOCTYPE html><html><head><title>{section}</title></head><body>'
+        f'<main>{render_section_html(profile, section, entries)}</main></body></html>'
+    )
+
+
+def make_handler(entries, latency_ms, jitter_ms, image_kb):
+    image = b"\x89PNG" + b"\0" * (image_kb * 1024)
+
+    class MockHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split("?", 1)[0]
+            if MEDIA_PATH.match(path):
+                self.send(200, "image/png", image)
+                return
+
+            time.sleep(max(0.0, latency_ms + random.uniform(-jitter_ms, jitter_ms)) / 1000)
+            if match := PROFILE_PATH.match(path):
+                self.send(200, "text/html; charset=utf-8", render_main(match.group(1)).encode("utf-8"))
+            elif (match := DETAILS_PATH.match(path)) and match.group(2) in ITEMS:
+                html = render_details(match.group(1), match.group(2), entries.get(match.group(2), entries["default"]))
+                self.send(200, "text/html; charset=utf-8", html.encode("utf-8"))
+            else:
+                self.send(404, "text/plain", b"Not found")
+
+        def send(self, status, content_type, body):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MockHandler
+
+
+def parse_entries(values, default=10):
+    entries = {"default": default}
+    for value in values:
+        section, sep, count = value.rpartition("=")
+        entries[section if sep else "default"] = int(count)
+    return entries
+
+
+def start(port=0, entries=None, latency_ms=0, jitter_ms=0, image_kb=20):
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(entries or {"default": 10}, latency_ms, jitter_ms, image_kb))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve synthetic LinkedIn profile pages for benchmarking")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on")
+    parser.add_argument("--entries", action="append", default=[], metavar="[SECTION=]N",
+                        help="List entries per details page, for all sections or one (default 10)")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Delay added to every page response")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Random +/- spread on the delay")
+    parser.add_argument("--image-kb", type=int, default=20, help="Size of every served image")
+    args = parser.parse_args()
+
+    server = start(args.port, parse_entries(args.entries), args.latency_ms, args.jitter_ms, args.image_kb)
+    print(f"Serving synthetic profiles on http://127.0.0.1:{server.server_port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
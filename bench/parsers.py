@@ -0,0 +1,128 @@
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+import dom
+from bench import mock_server
+from sections import SECTIONS, load
+from snapshots import iter_snapshots
+
+# Parse-only benchmark of the section extractors: times extract() over stored
+# {profile}.{section}.html snapshots and over synthetic details pages scaled
+# to large lists, for every parser backend. Allocations are measured in a
+# separate tracemalloc pass so they don't skew the timings; tracemalloc only
+# sees Python allocations, not memory held inside lxml or lexbor.
+# Snapshots are read from plain files or the snapshot store alike.
+# Run from the repository root: python -m bench.parsers --input output
+
+SCALES = [10, 100, 1000]
+
+
+def count_items(module, html):
+    if module.SPEC["items"] is None:
+        return 1
+    return len(dom.parse_html(html, "lxml").select(module.SPEC["items"]))
+
+
+def corpus_cases(input_dir):
+    return sorted((section, f"corpus/{profile}", html) for profile, section, html in iter_snapshots(input_dir))
+
+
+def synthetic_cases(sections, scales):
+    cases = []
+    for section in sections:
+        if section == "main":
+            cases.append((section, "synthetic/1", mock_server.render_main("bench-profile")))
+            continue
+        for n in scales:
+            cases.append((section, f"synthetic/{n}", mock_server.render_section_html("bench-profile", section, n)))
+    return cases
+
+
+def measure(extract, html, repeat):
+    runs = []
+    extract(html)
+    for _ in range(repeat):
+        start = time.perf_counter()
+        extract(html)
+        runs.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    extract(html)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(runs), statistics.median(runs), peak
+
+
+def run(cases, backends, repeat):
+    results = []
+    for section, source, html in cases:
+        module = load(section)
+        items = count_items(module, html)
+        for backend in backends:
+            dom.BACKEND = backend
+            best, median, peak = measure(module.extract, html, repeat)
+            results.append({
+                "section": section,
+                "source": source,
+                "backend": backend,
+                "bytes": len(html.encode("utf-8")),
+                "items": items,
+                "best_ms": round(best * 1000, 3),
+                "median_ms": round(median * 1000, 3),
+                "us_per_item": round(median * 1e6 / items, 1) if items else None,
+                "items_per_s": round(items / median) if median else None,
+                "peak_alloc_kb": round(peak / 1024, 1)
+            })
+    return results
+
+
+def key(result):
+    return result["section"], result["source"], result["backend"]
+
+
+def compare(results, baseline_path):
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {key(r): r for r in json.load(f)["results"]}
+    print(f"Against {baseline_path} (median time, new / old):")
+    for result in results:
+        old = baseline.get(key(result))
+        if not old or not old["median_ms"]:
+            continue
+        ratio = result["median_ms"] / old["median_ms"]
+        print(f"  {result['section']:<16} {result['source']:<20} {result['backend']:<11} "
+              f"{old['median_ms']:>9}ms -> {result['median_ms']:>9}ms  x{ratio:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark section extraction per parser backend")
+    parser.add_argument("--input", help="Directory of {profile}.{section}.html snapshots to include")
+    parser.add_argument("--sections", nargs="+", choices=SECTIONS, default=SECTIONS, help="Sections to benchmark")
+    parser.add_argument("--backends", nargs="+", choices=dom.BACKENDS, default=dom.BACKENDS, help="Parser backends to compare")
+    parser.add_argument("--scale", type=int, nargs="*", default=SCALES, help="Synthetic list sizes (none to skip)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case")
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--compare", help="Results file of an earlier run to compare against")
+    args = parser.parse_args()
+
+    cases = synthetic_cases(args.sections, args.scale)
+    if args.input:
+        cases += [c for c in corpus_cases(args.input) if c[0] in args.sections]
+
+    results = run(cases, args.backends, args.repeat)
+
+    for r in results:
+        print(f"{r['section']:<16} {r['source']:<20} {r['backend']:<11} {r['items']:>6} items "
+              f"{r['median_ms']:>9}ms  {r['us_per_item'] or '-'}us/item  {r['items_per_s'] or '-'} items/s  peak {r['peak_alloc_kb']} KB")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"repeat": args.repeat, "results": results}, f, indent=2)
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
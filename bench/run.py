@@ -0,0 +1,141 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from bench import mock_server
+
+# End-to-end load test: serves synthetic profiles from bench/mock_server.py on
+# a local port and runs scrape.py against it in a subprocess, then reports
+# throughput, per-section latency percentiles and the scraper's CPU and peak
+# memory. Run from the repository root: python -m bench.run
+
+ROOT = Path(__file__).resolve().parent.parent
+
+ALL_SECTIONS = ["main"] + mock_server.SECTIONS
+
+
+def percentile(values, p):
+    values = sorted(values)
+    if not values:
+        return None
+    k = (len(values) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(values) - 1)
+    return round(values[lo] + (values[hi] - values[lo]) * (k - lo), 1)
+
+
+def read_stats(path):
+    times = defaultdict(list)
+    if not os.path.exists(path):
+        return times
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            entry = json.loads(line)
+            times[entry["section"]].append(entry["ms"])
+    return times
+
+
+def run(args):
+    server = mock_server.start(0, mock_server.parse_entries(args.entries), args.latency_ms, args.jitter_ms, args.image_kb)
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    profiles = [f"bench-{i}" for i in range(args.profiles)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cookies = os.path.join(tmp, "cookies.json")
+        with open(cookies, "w") as f:
+            json.dump([{"name": "li_at", "value": "bench", "domain": ".linkedin.com"}], f)
+        stats = os.path.join(tmp, "stats.jsonl")
+
+        cmd = [
+            sys.executable, str(ROOT / "scrape.py"),
+            "--profiles", *profiles,
+            "--sections", *args.sections,
+            "--cookies", cookies,
+            "--output", args.output or os.path.join(tmp, "output"),
+            "--base-url", base_url,
+            "--stats", stats,
+            "--concurrency", str(args.concurrency),
+            "--parser", args.parser,
+            "--extract", args.extract,
+            "--rate", str(args.rate)
+        ]
+        if not args.headed:
+            cmd.append("--headless")
+        if args.parallel_sections:
+            cmd.append("--parallel-sections")
+
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=ROOT, check=True, stdout=None if args.verbose else subprocess.DEVNULL)
+        elapsed = time.perf_counter() - start
+        times = read_stats(stats)
+
+    server.shutdown()
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    return {
+        "profiles": args.profiles,
+        "sections": args.sections,
+        "concurrency": args.concurrency,
+        "parallel_sections": args.parallel_sections,
+        "parser": args.parser,
+        "extract": args.extract,
+        "entries": args.entries,
+        "latency_ms": args.latency_ms,
+        "elapsed_s": round(elapsed, 2),
+        "profiles_per_s": round(args.profiles / elapsed, 3),
+        "cpu_user_s": round(usage.ru_utime, 2),
+        "cpu_system_s": round(usage.ru_stime, 2),
+        # Largest single child, which is normally the browser rather than Python
+        "peak_rss_mb": round(usage.ru_maxrss / 1024, 1),
+        "section_ms": {
+            section: {
+                "count": len(values),
+                "p50": percentile(values, 50),
+                "p90": percentile(values, 90),
+                "p99": percentile(values, 99)
+            }
+            for section, values in times.items()
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scrape.py end to end against a local mock profile server")
+    parser.add_argument("--profiles", type=int, default=20, help="Number of synthetic profiles to scrape")
+    parser.add_argument("--sections", nargs="+", choices=ALL_SECTIONS, default=ALL_SECTIONS, help="Sections to scrape")
+    parser.add_argument("--concurrency", type=int, default=1, help="Passed through to scrape.py")
+    parser.add_argument("--parallel-sections", action="store_true", help="Passed through to scrape.py")
+    parser.add_argument("--parser", default="bs4", help="Passed through to scrape.py")
+    parser.add_argument("--extract", choices=["html", "browser"], default="html", help="Passed through to scrape.py")
+    parser.add_argument("--rate", type=float, default=0, help="Navigation rate passed to scrape.py (0, the default, is unpaced)")
+    parser.add_argument("--entries", action="append", default=[], metavar="[SECTION=]N",
+                        help="List entries per details page, for all sections or one (default 10)")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Delay the mock server adds to every page")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Random +/- spread on the delay")
+    parser.add_argument("--image-kb", type=int, default=20, help="Size of every served image")
+    parser.add_argument("--headed", action="store_true", help="Show the browser window")
+    parser.add_argument("--output", help="Keep scraped output in this directory instead of a temporary one")
+    parser.add_argument("--json", help="Also write the results to this file")
+    parser.add_argument("--verbose", action="store_true", help="Show scrape.py output")
+    args = parser.parse_args()
+
+    results = run(args)
+
+    print(f"{results['profiles']} profiles in {results['elapsed_s']}s ({results['profiles_per_s']} profiles/s)")
+    print(f"CPU: {results['cpu_user_s']}s user, {results['cpu_system_s']}s system; peak RSS {results['peak_rss_mb']} MB")
+    for section, ms in results["section_ms"].items():
+        print(f"  {section:<16} n={ms['count']:<5} p50={ms['p50']}ms p90={ms['p90']}ms p99={ms['p99']}ms")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
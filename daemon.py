@@ -0,0 +1,155 @@
+import asyncio
+import json
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import parse_qs, urlparse
+from playwright.async_api import async_playwright
+from engine import scrape_profile_async
+from sections import SECTIONS
+import governor
+import sinks
+
+# Keeps one browser with the cookies loaded warm between jobs and takes
+# profiles over a local HTTP endpoint, so a lookup only pays for its pages:
+#
+#   GET  /scrape?profile=ID[&sections=main,experience]
+#   POST /scrape  {"profile": "ID", "sections": ["main", "experience"]}
+#   GET  /health
+#
+# Each request blocks until its profile is scraped and returns the profile
+# JSON. Jobs run on a pool of worker pages, --concurrency of them.
+
+
+def make_handler(loop, queue, default_sections):
+    class DaemonHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/health":
+                self.send(200, {"status": "ok", "queued": queue.qsize()})
+            elif url.path == "/scrape":
+                query = parse_qs(url.query)
+                sections = query["sections"][0].split(",") if "sections" in query else None
+                self.run_job(query.get("profile", [None])[0], sections)
+            else:
+                self.send(404, {"error": "not found"})
+
+        def do_POST(self):
+            if urlparse(self.path).path != "/scrape":
+                self.send(404, {"error": "not found"})
+                return
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            except ValueError:
+                self.send(400, {"error": "invalid JSON"})
+                return
+            if not isinstance(body, dict):
+                self.send(400, {"error": "expected a JSON object"})
+                return
+            self.run_job(body.get("profile"), body.get("sections"))
+
+        def run_job(self, profile, sections):
+            sections = sections or default_sections
+            if not profile or not isinstance(profile, str):
+                self.send(400, {"error": "profile is required"})
+                return
+            if not isinstance(sections, list) or not all(isinstance(s, str) for s in sections):
+                self.send(400, {"error": "sections must be a list of section names"})
+                return
+            unknown = [s for s in sections if s not in SECTIONS]
+            if unknown:
+                self.send(400, {"error": f"unknown sections: {', '.join(unknown)}"})
+                return
+            future = asyncio.run_coroutine_threadsafe(submit(queue, profile, sections), loop)
+            try:
+                self.send(200, {"profile": profile, **future.result()})
+            except Exception as e:
+                self.send(500, {"profile": profile, "error": repr(e)})
+
+        def send(self, status, data):
+            body = json.dumps(data).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return DaemonHandler
+
+
+# Jobs for the same profile run one at a time: each merges into the profile
+# JSON the one before it wrote
+locks = {}
+
+
+async def scrape_locked(page, profile, sections, output_dir, parallel_sections, merge):
+    entry = locks.setdefault(profile, {"lock": asyncio.Lock(), "jobs": 0})
+    entry["jobs"] += 1
+    try:
+        async with entry["lock"]:
+            return await scrape_profile_async(page, profile, sections, output_dir, parallel_sections, merge)
+    finally:
+        entry["jobs"] -= 1
+        if not entry["jobs"]:
+            del locks[profile]
+
+
+async def submit(queue, profile, sections):
+    result = asyncio.get_running_loop().create_future()
+    await queue.put((profile, sections, result))
+    return await result
+
+
+async def worker(session, queue, output_dir, parallel_sections, merge):
+    page = await session["context"].new_page()
+    navigations = 0
+    try:
+        while not governor.due(session):
+            profile, sections, result = await queue.get()
+            try:
+                profile_json = await scrape_locked(page, profile, sections, output_dir, parallel_sections, merge)
+                # Buffered sinks would otherwise hold the job back until a batch fills
+                sinks.flush(output_dir)
+                result.set_result(profile_json)
+            except Exception as e:
+                print(f"Failed to scrape {profile}: {e}")
+                result.set_exception(e)
+            finally:
+                queue.task_done()
+            governor.count(session, len(sections))
+            navigations += len(sections)
+            if governor.page_due(navigations):
+                await page.close()
+                page = await session["context"].new_page()
+                navigations = 0
+                governor.stats["pages"] += 1
+    finally:
+        await page.close()
+
+
+async def serve(cookies, sections, output_dir, port, concurrency=1, parallel_sections=False, headless=True, merge=False):
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+
+    async with async_playwright() as p:
+        session = governor.new_session()
+        await governor.open_session_async(p, session, cookies, headless)
+
+        server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(loop, queue, sections))
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"Daemon ready on http://127.0.0.1:{server.server_port} with {max(1, concurrency)} workers")
+
+        try:
+            # Workers only return when the session is due to be replaced;
+            # jobs arriving meanwhile wait in the queue
+            while True:
+                await asyncio.gather(*(
+                    worker(session, queue, output_dir, parallel_sections, merge) for _ in range(max(1, concurrency))
+                ))
+                await governor.open_session_async(p, session, cookies, headless)
+        finally:
+            server.shutdown()
+            await governor.close_session_async(session)
@@ -0,0 +1,170 @@
+from contextlib import contextmanager
+from functools import lru_cache
+from bs4 import BeautifulSoup
+from timing import span
+
+# Selected with --parser; every backend returns nodes that answer the small
+# part of the BeautifulSoup API the section extractors use: select,
+# select_one, get_text, has_attr, [attr], find_parent and string
+BACKEND = "bs4"
+
+BACKENDS = ["bs4", "lxml", "selectolax"]
+
+# Text under these tags is not part of get_text() in BeautifulSoup either
+SKIP_TEXT = {"script", "style", "template"}
+
+
+def parse_html(html, backend=None):
+    backend = backend or BACKEND
+    with span("parse"):
+        if backend == "lxml":
+            return parse_lxml(html)
+        if backend == "selectolax":
+            return parse_selectolax(html)
+        return BeautifulSoup(html, "html.parser")
+
+
+@contextmanager
+def parsed(html, backend=None):
+    # BeautifulSoup trees are full of reference cycles and would otherwise
+    # wait for the cycle collector; decompose() frees them right away. lxml
+    # and lexbor trees go as soon as the last node wrapper does.
+    root = parse_html(html, backend)
+    try:
+        yield root
+    finally:
+        if isinstance(root, BeautifulSoup):
+            root.decompose()
+
+
+def join_strings(strings, separator, strip):
+    if strip:
+        strings = (s.strip() for s in strings)
+        return separator.join(s for s in strings if s)
+    return separator.join(strings)
+
+
+def parse_lxml(html):
+    from lxml import html as lxml_html
+    if not html.strip():
+        html = "<html></html>"
+    return LxmlNode(lxml_html.document_fromstring(html))
+
+
+@lru_cache(maxsize=None)
+def lxml_selector(css):
+    from cssselect import HTMLTranslator
+    from lxml import etree
+    # "descendant::" rather than cssselect's default "descendant-or-self::",
+    # which would let an item match its own selector
+    return etree.XPath(HTMLTranslator().css_to_xpath(css, prefix="descendant::"), smart_strings=False)
+
+
+@lru_cache(maxsize=None)
+def lxml_text():
+    from lxml import etree
+    skip = " or ".join(f"ancestor::{tag}" for tag in sorted(SKIP_TEXT))
+    return etree.XPath(f"descendant::text()[not({skip})]", smart_strings=False)
+
+
+class LxmlNode:
+    __slots__ = ("el",)
+
+    def __init__(self, el):
+        self.el = el
+
+    def select(self, css):
+        return [LxmlNode(el) for el in lxml_selector(css)(self.el)]
+
+    def select_one(self, css):
+        found = lxml_selector(css)(self.el)
+        return LxmlNode(found[0]) if found else None
+
+    def get_text(self, separator="", strip=False):
+        return join_strings(lxml_text()(self.el), separator, strip)
+
+    def has_attr(self, name):
+        return name in self.el.attrib
+
+    def __getitem__(self, name):
+        return self.el.attrib[name]
+
+    def find_parent(self):
+        parent = self.el.getparent()
+        return LxmlNode(parent) if parent is not None else None
+
+    @property
+    def string(self):
+        el = self.el
+        while True:
+            if len(el) == 0:
+                return el.text
+            if len(el) > 1 or el.text or el[0].tail:
+                return None
+            el = el[0]
+            if not isinstance(el.tag, str):
+                return el.text
+
+    def __str__(self):
+        from lxml import html as lxml_html
+        return lxml_html.tostring(self.el, encoding="unicode", with_tail=False)
+
+
+def parse_selectolax(html):
+    from selectolax.lexbor import LexborHTMLParser
+    return LexborNode(LexborHTMLParser(html).root)
+
+
+def lexbor_strings(node):
+    for child in node.iter(include_text=True):
+        tag = child.tag
+        if tag == "-text":
+            yield child.text_content
+        elif tag != "-comment" and tag not in SKIP_TEXT:
+            yield from lexbor_strings(child)
+
+
+class LexborNode:
+    __slots__ = ("node",)
+
+    def __init__(self, node):
+        self.node = node
+
+    # lexbor matches the node itself too; BeautifulSoup only looks below it
+    def select(self, css):
+        own = self.node.mem_id
+        return [LexborNode(n) for n in self.node.css(css) if n.mem_id != own]
+
+    def select_one(self, css):
+        own = self.node.mem_id
+        for n in self.node.css(css):
+            if n.mem_id != own:
+                return LexborNode(n)
+        return None
+
+    def get_text(self, separator="", strip=False):
+        return join_strings(lexbor_strings(self.node), separator, strip)
+
+    def has_attr(self, name):
+        return name in self.node.attributes
+
+    def __getitem__(self, name):
+        return self.node.attributes[name]
+
+    def find_parent(self):
+        parent = self.node.parent
+        return LexborNode(parent) if parent is not None else None
+
+    @property
+    def string(self):
+        node = self.node
+        while True:
+            children = list(node.iter(include_text=True))
+            if len(children) != 1:
+                return None
+            node = children[0]
+            if node.tag in ("-text", "-comment"):
+                return node.text_content
+
+    def __str__(self):
+        return self.node.html
@@ -0,0 +1,177 @@
+import asyncio
+import os
+from playwright.async_api import async_playwright
+from fetch import Unavailable, fetch_section_async
+from manifest import commit, record_unavailable, report_changes, settle, take
+from output import read_profile
+import frontier
+import governor
+import sinks
+
+
+async def scrape_tab_async(context, profile, section, output_dir):
+    page = await context.new_page()
+    try:
+        return await fetch_section_async(page, profile, section, output_dir)
+    finally:
+        await page.close()
+
+
+async def outcome(fetch):
+    try:
+        return await fetch
+    except Exception as e:
+        return e
+
+
+def start_profile(output_dir, profile, merge):
+    # Shared with the sequential path in scrape.py. Returns the profile JSON
+    # to build on and the keys it had on disk
+    take(output_dir, profile)  # held from an attempt that never got to the write
+    profile_json = read_profile(output_dir, profile) if merge else {}
+    os.makedirs(output_dir, exist_ok=True)
+    return profile_json, set(profile_json)
+
+
+def finish_profile(output_dir, profile, sections, results, profile_json, stored, merge):
+    # results maps each fetched section to its JSON, or the exception it
+    # raised; sections after an Unavailable one are missing from it
+    status = profile_json.pop("status", None)
+    changes = {}
+    unavailable = None
+    for section, result in results.items():
+        if isinstance(result, Unavailable):
+            unavailable = unavailable or result
+        else:
+            changes[section] = settle(output_dir, profile, section, result, profile_json)
+    if unavailable:
+        skipped = [s for s in sections if s not in changes]
+        record_unavailable(output_dir, profile, skipped, unavailable.reason)
+    lines = take(output_dir, profile)
+    # Sections that came back ok or empty; only these are written to the
+    # sink, a failed one keeps what it had
+    settled = [s for s, c in changes.items() if c is not None]
+
+    if unavailable and unavailable.reason == "authwall":
+        return finish_blocked(output_dir, profile, changes, settled, lines, profile_json, status, merge)
+
+    if unavailable:
+        profile_json["status"] = unavailable.reason
+    changed = report_changes(profile, changes)
+
+    # A merged profile with no changes is already on disk as is, unless it
+    # never got there
+    missing = not stored or any(s in profile_json and s not in stored for s in sections)
+    if changed or not merge or profile_json.get("status") != status or missing:
+        sinks.write(output_dir, profile, profile_json, settled, lines)
+    else:
+        commit(output_dir, lines)
+    frontier.observe(profile, profile_json, changes)
+    return profile_json
+
+
+def finish_blocked(output_dir, profile, changes, settled, lines, profile_json, status, merge):
+    # An auth wall is the cookies' fault, not the profile's: the stored
+    # profile stays as it is, apart from sections that loaded before the wall
+    if settled:
+        report_changes(profile, changes)
+        stored_json = read_profile(output_dir, profile) if not merge else {**profile_json, "status": status}
+        for section in settled:
+            if section in profile_json:
+                stored_json[section] = profile_json[section]
+            else:
+                stored_json.pop(section, None)
+        if stored_json.get("status") is None:
+            stored_json.pop("status", None)
+        sinks.write(output_dir, profile, stored_json, settled, lines)
+    else:
+        commit(output_dir, lines)
+    frontier.observe(profile, {"status": "authwall"}, changes)
+    # Tells the caller to stop; never written
+    return {**profile_json, "status": "authwall"}
+
+
+async def scrape_profile_async(page, profile, sections, output_dir, parallel_sections=False, merge=False):
+    profile_json, stored = start_profile(output_dir, profile, merge)
+
+    results = {}
+    if parallel_sections and len(sections) > 1:
+        # The first section reuses the worker's page and loads on its own, so
+        # an auth wall or missing profile stops the rest before they start;
+        # the others then load at once in sibling tabs
+        results[sections[0]] = await outcome(fetch_section_async(page, profile, sections[0], output_dir))
+        if not isinstance(results[sections[0]], Unavailable):
+            rest = await asyncio.gather(
+                *(scrape_tab_async(page.context, profile, section, output_dir) for section in sections[1:]),
+                return_exceptions=True
+            )
+            results.update(zip(sections[1:], rest))
+    else:
+        for section in sections:
+            results[section] = await outcome(fetch_section_async(page, profile, section, output_dir))
+            if isinstance(results[section], Unavailable):
+                break
+
+    return finish_profile(output_dir, profile, sections, results, profile_json, stored, merge)
+
+
+def drop_jobs(queue):
+    while not queue.empty():
+        queue.get_nowait()
+        queue.task_done()
+
+
+async def worker(session, queue, output_dir, parallel_sections, merge):
+    # Each worker owns one page; pages of a context share the cookies. It
+    # stops taking jobs when the session is due to be replaced. Returns
+    # whether it ran into an auth wall
+    page = await session["context"].new_page()
+    navigations = 0
+    try:
+        while not governor.due(session):
+            try:
+                profile, sections = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            try:
+                profile_json = await scrape_profile_async(page, profile, sections, output_dir, parallel_sections, merge)
+                if profile_json.get("status") == "authwall":
+                    # Expired cookies don't come back; the remaining profiles
+                    # stay pending in the manifest
+                    print(f"Auth wall at {profile}, stopping")
+                    drop_jobs(queue)
+                    return True
+            except Exception as e:
+                print(f"Failed to scrape {profile}: {e}")
+            finally:
+                queue.task_done()
+            governor.count(session, len(sections))
+            navigations += len(sections)
+            if governor.page_due(navigations):
+                await page.close()
+                page = await session["context"].new_page()
+                navigations = 0
+                governor.stats["pages"] += 1
+    finally:
+        await page.close()
+    return False
+
+
+async def run(jobs, cookies, output_dir, concurrency, parallel_sections=False, headless=False, merge=False):
+    # jobs are (profile, sections) pairs. Returns whether the run stopped at
+    # an auth wall
+    queue = asyncio.Queue()
+    blocked = False
+    for job in jobs:
+        queue.put_nowait(job)
+
+    async with async_playwright() as p:
+        session = governor.new_session()
+        while not queue.empty():
+            await governor.open_session_async(p, session, cookies, headless)
+            workers = min(concurrency, queue.qsize())
+            results = await asyncio.gather(*(worker(session, queue, output_dir, parallel_sections, merge) for _ in range(workers)))
+            blocked = blocked or any(results)
+        if session["browser"]:
+            await governor.close_session_async(session)
+    return blocked
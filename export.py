@@ -0,0 +1,66 @@
+import gzip
+import json
+from pathlib import Path
+from sinks import PROFILE_COLUMNS, ROLE_COLUMNS, TABLES
+
+# Flattens scraped profiles into one columnar table per section and writes
+# them as Parquet files, the same tables the SQLite sink keeps: profiles,
+# experience (one row per company), experience_roles and one per list
+# section. Needs pyarrow.
+
+
+def iter_profiles(input_dir):
+    # {profile}.json files, then the jsonl sink, where later lines win
+    profiles = {}
+    for path in sorted(Path(input_dir).glob("*.json")):
+        if path.name.endswith(".api.json"):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            profiles[path.stem] = json.load(f)
+    for name, opener in (("profiles.jsonl", open), ("profiles.jsonl.gz", gzip.open)):
+        path = Path(input_dir) / name
+        if not path.exists():
+            continue
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                profile = profiles.setdefault(entry["profile"], {})
+                for section in entry["sections"]:
+                    profile.pop(section, None)
+                # Every line carries the profile's current status, if any
+                profile.pop("status", None)
+                profile.update(entry["data"])
+    return profiles.items()
+
+
+def flatten(profiles):
+    tables = {"profiles": {c: [] for c in ["profile_id", *PROFILE_COLUMNS]}}
+    for table, columns in TABLES.items():
+        tables[table] = {c: [] for c in ["profile_id", "position", *columns]}
+    tables["experience_roles"] = {c: [] for c in ["profile_id", "position", "role", *ROLE_COLUMNS]}
+
+    def add(table, values):
+        for c, column in tables[table].items():
+            column.append(values.get(c))
+
+    for profile, profile_json in profiles:
+        add("profiles", {"profile_id": profile, **profile_json.get("main", {})})
+        for section in TABLES:
+            for i, record in enumerate(profile_json.get(section) or []):
+                add(section, {**record, "profile_id": profile, "position": i})
+                if section != "experience":
+                    continue
+                for j, role in enumerate(record.get("roles", [])):
+                    add("experience_roles", {"company": record.get("company"), **role, "profile_id": profile, "position": i, "role": j})
+    return tables
+
+
+def export(input_dir, output_dir, compression="zstd"):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    tables = flatten(iter_profiles(input_dir))
+    for name, columns in tables.items():
+        pq.write_table(pa.table(columns), Path(output_dir) / f"{name}.parquet", compression=compression)
+    return {name: len(columns["profile_id"]) for name, columns in tables.items()}
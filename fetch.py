@@ -0,0 +1,277 @@
+import re
+import zlib
+from api import decode, read_payloads, read_payloads_async, write_fixture
+from ratelimit import BLOCKED_URL, goto, goto_async
+from resources import route, route_async
+from readiness import wait_ready, wait_hidden, wait_ready_async, wait_hidden_async
+from sections import load
+import memo
+import snapshots
+import writer
+from timing import section_span, span
+from specs import CAPTURE_JS
+
+# "html" ships each section's HTML to Python and parses it there, "browser"
+# runs the section's field spec inside the page and only returns the records
+EXTRACT_MODE = "html"
+
+# Share of profiles whose HTML is still saved in browser mode
+SNAPSHOT_RATE = 0.0
+
+# Build sections from the Voyager API responses the page loads, falling back
+# to the DOM when they are missing; optionally save them as replay fixtures
+USE_API = False
+RECORD_API = False
+
+# Overridden with --base-url to point at a local stand-in
+BASE_URL = "https://www.linkedin.com"
+
+PROFILE_URL = "{base}/in/{profile}"
+DETAILS_URL = "{base}/in/{profile}/details/{section}/"
+
+# How each section's page is loaded: where it lives, which selector marks it
+# as ready, which element holds the content (None for the whole page) and an
+# optional "see more" button to expand first
+PAGES = {
+    "main": {
+        "url": PROFILE_URL,
+        "ready": "h1",
+        "content": None,
+        "expand": "button.inline-show-more-text__see-more"
+    }
+}
+
+DETAILS_PAGE = {
+    "url": DETAILS_URL,
+    "ready": "li.pvs-list__paged-list-item",
+    "content": "main",
+    "expand": None
+}
+
+
+# Where LinkedIn sends requests for profiles that don't exist
+NOT_FOUND_URL = re.compile(r"/in/unavailable/?$|/404/?$")
+NOT_FOUND_STATUS = {404, 410}
+
+
+class Unavailable(Exception):
+    # The page can't be scraped at all; reason is "authwall" or "not_found"
+    def __init__(self, reason):
+        super().__init__(reason)
+        self.reason = reason
+
+
+def classify(page, response):
+    # Checked right after navigation, before waiting for content that won't come
+    if BLOCKED_URL.search(page.url):
+        return "authwall"
+    if (response and response.status in NOT_FOUND_STATUS) or NOT_FOUND_URL.search(page.url):
+        return "not_found"
+    return None
+
+
+def page_spec(section):
+    return PAGES.get(section, DETAILS_PAGE)
+
+
+def section_url(profile, section):
+    return page_spec(section)["url"].format(base=BASE_URL, profile=profile, section=section)
+
+
+def save_snapshot(output_dir, profile, section, html):
+    # Runs on the background writer
+    with span("snapshot", profile, section):
+        return snapshots.write_snapshot(output_dir, profile, section, html)
+
+
+def write_snapshot(output_dir, profile, section, html):
+    writer.submit(save_snapshot, output_dir, profile, section, html.strip())
+
+
+def parse_snapshot(output_dir, profile, section, html, module):
+    if not memo.ENABLED:
+        write_snapshot(output_dir, profile, section, html)
+        with span("extract"):
+            return module.extract(html)
+
+    with span("hash"):
+        digest = memo.snapshot_hash(section, html)
+    if not memo.unchanged(output_dir, profile, section, digest):
+        write_snapshot(output_dir, profile, section, html)
+        memo.remember_snapshot(output_dir, profile, section, digest)
+    section_json = memo.cached(output_dir, digest)
+    if section_json is memo.MISSING:
+        with span("extract"):
+            section_json = module.extract(html)
+        memo.store(output_dir, digest, section_json)
+    return section_json
+
+
+def sampled(profile):
+    # Stable per profile, so a sampled profile keeps all of its snapshots
+    return zlib.crc32(profile.encode("utf-8")) % 10000 < SNAPSHOT_RATE * 10000
+
+
+def open_section(page, profile, section):
+    spec = page_spec(section)
+    route(page, section)
+    with span("navigate"):
+        response = goto(page, section_url(profile, section), wait_until="domcontentloaded")
+    reason = classify(page, response)
+    if reason:
+        raise Unavailable(reason)
+    with span("ready"):
+        wait_ready(page, spec["ready"])
+
+    if spec["expand"]:
+        with span("expand"):
+            try:
+                button = page.query_selector(spec["expand"])
+                if button and button.is_visible():
+                    button.click()
+                    wait_hidden(page, spec["expand"], timeout=500)
+            except:
+                pass
+
+    return spec
+
+
+def read_html(page, spec):
+    with span("serialize"):
+        if spec["content"]:
+            content = page.query_selector(spec["content"])
+            if not content:
+                return None
+            return content.inner_html()
+        # Re-extract full page HTML after possible DOM changes
+        return page.content()
+
+
+def extract_dom(page, spec, module, profile, section, output_dir):
+    if EXTRACT_MODE == "browser":
+        with span("capture"):
+            raw_items = page.evaluate(CAPTURE_JS, [spec["content"], module.SPEC["browser"]])
+        if raw_items is None:
+            return None
+        if sampled(profile):
+            html = read_html(page, spec)
+            if html is not None:
+                write_snapshot(output_dir, profile, section, html)
+        with span("extract"):
+            return module.build(raw_items)
+
+    html = read_html(page, spec)
+    if html is None:
+        return None
+    return parse_snapshot(output_dir, profile, section, html, module)
+
+
+def fetch_section(page, profile, section, output_dir):
+    with section_span(profile, section):
+        return load_section(page, profile, section, output_dir)
+
+
+def load_section(page, profile, section, output_dir):
+    module = load(section)
+    if not USE_API:
+        spec = open_section(page, profile, section)
+        return extract_dom(page, spec, module, profile, section, output_dir)
+
+    responses = []
+    listener = responses.append
+    page.on("response", listener)
+    try:
+        spec = open_section(page, profile, section)
+    finally:
+        page.remove_listener("response", listener)
+
+    with span("payloads"):
+        payloads = read_payloads(responses)
+        if RECORD_API:
+            write_fixture(output_dir, profile, section, payloads)
+        section_json = decode(section, profile, payloads)
+    if section_json is not None:
+        return section_json
+    return extract_dom(page, spec, module, profile, section, output_dir)
+
+
+async def open_section_async(page, profile, section):
+    spec = page_spec(section)
+    await route_async(page, section)
+    with span("navigate"):
+        response = await goto_async(page, section_url(profile, section), wait_until="domcontentloaded")
+    reason = classify(page, response)
+    if reason:
+        raise Unavailable(reason)
+    with span("ready"):
+        await wait_ready_async(page, spec["ready"])
+
+    if spec["expand"]:
+        with span("expand"):
+            try:
+                button = await page.query_selector(spec["expand"])
+                if button and await button.is_visible():
+                    await button.click()
+                    await wait_hidden_async(page, spec["expand"], timeout=500)
+            except:
+                pass
+
+    return spec
+
+
+async def read_html_async(page, spec):
+    with span("serialize"):
+        if spec["content"]:
+            content = await page.query_selector(spec["content"])
+            if not content:
+                return None
+            return await content.inner_html()
+        return await page.content()
+
+
+async def extract_dom_async(page, spec, module, profile, section, output_dir):
+    if EXTRACT_MODE == "browser":
+        with span("capture"):
+            raw_items = await page.evaluate(CAPTURE_JS, [spec["content"], module.SPEC["browser"]])
+        if raw_items is None:
+            return None
+        if sampled(profile):
+            html = await read_html_async(page, spec)
+            if html is not None:
+                write_snapshot(output_dir, profile, section, html)
+        with span("extract"):
+            return module.build(raw_items)
+
+    html = await read_html_async(page, spec)
+    if html is None:
+        return None
+    return parse_snapshot(output_dir, profile, section, html, module)
+
+
+async def fetch_section_async(page, profile, section, output_dir):
+    with section_span(profile, section):
+        return await load_section_async(page, profile, section, output_dir)
+
+
+async def load_section_async(page, profile, section, output_dir):
+    module = load(section)
+    if not USE_API:
+        spec = await open_section_async(page, profile, section)
+        return await extract_dom_async(page, spec, module, profile, section, output_dir)
+
+    responses = []
+    listener = responses.append
+    page.on("response", listener)
+    try:
+        spec = await open_section_async(page, profile, section)
+    finally:
+        page.remove_listener("response", listener)
+
+    with span("payloads"):
+        payloads = await read_payloads_async(responses)
+        if RECORD_API:
+            write_fixture(output_dir, profile, section, payloads)
+        section_json = decode(section, profile, payloads)
+    if section_json is not None:
+        return section_json
+    return await extract_dom_async(page, spec, module, profile, section, output_dir)
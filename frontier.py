@@ -0,0 +1,132 @@
+import hashlib
+import re
+import sqlite3
+import time
+from pathlib import Path
+from urllib.parse import unquote
+
+# Crawl state in frontier.db in the output directory. Every profile ID ever
+# queued is kept in seen as a 64-bit hash in an integer-keyed table, a few
+# bytes per ID on disk however large the crawl grows. frontier holds the
+# profiles still to scrape, with how deep in the crawl they were found and
+# how many scraped profiles recommend them; claim() takes the shallowest,
+# most recommended ones off an index. A profile leaves the frontier once its
+# recommendations are scraped; one that failed goes back in the queue, for
+# up to MAX_FAILURES attempts. Profiles claimed by a run that died go back
+# in the queue when the frontier is next opened.
+DB = "frontier.db"
+
+MAX_DEPTH = 2
+
+MAX_FAILURES = 3
+
+PROFILE_URL = re.compile(r"/in/([^/?#]+)")
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS seen (id INTEGER PRIMARY KEY)",
+    "CREATE TABLE IF NOT EXISTS frontier (profile TEXT PRIMARY KEY, depth INTEGER, hits INTEGER, added REAL, "
+    "claimed INTEGER DEFAULT 0, failures INTEGER DEFAULT 0)",
+    "CREATE INDEX IF NOT EXISTS frontier_next ON frontier (claimed, depth, hits DESC, added)"
+]
+
+# Set while crawling; scraped profiles report their links to it
+ACTIVE = None
+
+stats = {"discovered": 0, "queued": 0, "too_deep": 0, "failed": 0}
+
+
+def normalize(profile):
+    return unquote(profile).strip().strip("/")
+
+
+def profile_id(url):
+    match = PROFILE_URL.search(url or "")
+    return normalize(match.group(1)) if match else None
+
+
+def seen_key(profile):
+    # Vanity IDs are case-insensitive, member IDs (ACoAA...) are not
+    if not profile.startswith("ACoA"):
+        profile = profile.lower()
+    return int.from_bytes(hashlib.blake2b(profile.encode("utf-8"), digest_size=8).digest(), "big", signed=True)
+
+
+def open_frontier(output_dir):
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(Path(output_dir) / DB)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    with db:
+        for statement in SCHEMA:
+            db.execute(statement)
+        db.execute("UPDATE frontier SET claimed = 0 WHERE claimed = 1")
+    return {"db": db, "claimed": {}}
+
+
+def add(frontier, profiles, depth):
+    # Returns how many profiles were new
+    db = frontier["db"]
+    added = 0
+    with db:
+        for profile in profiles:
+            if db.execute("INSERT OR IGNORE INTO seen VALUES (?)", (seen_key(profile),)).rowcount:
+                db.execute("INSERT OR IGNORE INTO frontier VALUES (?, ?, 1, ?, 0, 0)", (profile, depth, time.time()))
+                added += 1
+            else:
+                # Found again before it was scraped: move it up the queue
+                db.execute("UPDATE frontier SET hits = hits + 1 WHERE profile = ? AND claimed = 0", (profile,))
+    return added
+
+
+def claim(frontier, count):
+    db = frontier["db"]
+    with db:
+        rows = db.execute("SELECT profile, depth FROM frontier WHERE claimed = 0 AND failures < ? "
+                          "ORDER BY depth, hits DESC, added LIMIT ?", (MAX_FAILURES, count)).fetchall()
+        db.executemany("UPDATE frontier SET claimed = 1 WHERE profile = ?", [(profile,) for profile, _ in rows])
+    frontier["claimed"].update(rows)
+    return [profile for profile, _ in rows]
+
+
+def links(profile_json):
+    ids = (profile_id(r.get("profile_url")) for r in profile_json.get("recommendations") or [])
+    return list(dict.fromkeys(filter(None, ids)))
+
+
+def observe(profile, profile_json, changes):
+    # Called with every scraped profile and what settle() returned for its
+    # sections (None for a failed one). Once its recommendations are in,
+    # queues the profiles they link to and takes it off the frontier
+    if ACTIVE is None or profile not in ACTIVE["claimed"]:
+        return
+    depth = ACTIVE["claimed"].pop(profile)
+    status = profile_json.get("status")
+    if status != "not_found" and (status or changes.get("recommendations") is None):
+        # An auth wall is the cookies' fault, not the profile's
+        stats["failed"] += 1
+        with ACTIVE["db"]:
+            ACTIVE["db"].execute("UPDATE frontier SET claimed = 0, failures = failures + ? WHERE profile = ?",
+                                 (int(status != "authwall"), profile))
+        return
+    found = [p for p in links(profile_json) if seen_key(p) != seen_key(profile)]
+    stats["discovered"] += len(found)
+    if found and depth < MAX_DEPTH:
+        stats["queued"] += add(ACTIVE, found, depth + 1)
+    elif found:
+        stats["too_deep"] += len(found)
+    with ACTIVE["db"]:
+        ACTIVE["db"].execute("DELETE FROM frontier WHERE profile = ?", (profile,))
+
+
+def size(frontier):
+    queued, = frontier["db"].execute("SELECT COUNT(*) FROM frontier").fetchone()
+    seen, = frontier["db"].execute("SELECT COUNT(*) FROM seen").fetchone()
+    return queued, seen
+
+
+def summary(frontier):
+    queued, seen = size(frontier)
+    return (
+        f"{seen} profiles seen, {queued} queued; {stats['discovered']} links found, {stats['queued']} new, "
+        f"{stats['too_deep']} beyond depth {MAX_DEPTH}, {stats['failed']} profiles to retry"
+    )
@@ -0,0 +1,143 @@
+import os
+import time
+from pathlib import Path
+
+# Keeps long runs at a flat memory footprint by replacing Chromium's pages,
+# contexts and the browser itself as they age. A worker's page is replaced
+# after PAGE_NAVIGATIONS; the context (cookies reloaded) after
+# CONTEXT_NAVIGATIONS; the browser after BROWSER_NAVIGATIONS or once its
+# processes hold more than MAX_BROWSER_RSS_MB. Contexts and the browser are
+# only replaced between profiles: workers stop taking jobs once one is due,
+# and the run continues on the new session when they have all finished.
+# 0 disables a limit.
+PAGE_NAVIGATIONS = 100
+CONTEXT_NAVIGATIONS = 500
+BROWSER_NAVIGATIONS = 2000
+MAX_BROWSER_RSS_MB = 0
+
+# Reading the process tree isn't free; RSS is sampled at most this often
+RSS_INTERVAL_S = 10
+
+stats = {"pages": 0, "contexts": 0, "browsers": 0, "peak_rss_mb": 0}
+
+
+def children_rss_mb():
+    # Resident memory of every process below this one: the Playwright driver
+    # and the browser's processes
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+    if psutil:
+        total = 0
+        for child in psutil.Process().children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                # Renderers come and go between listing and reading them
+                continue
+        return total / 2 ** 20
+    parents = {}
+    rss = {}
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    for stat in Path("/proc").glob("[0-9]*/stat"):
+        try:
+            fields = stat.read_text().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        pid = int(stat.parent.name)
+        parents[pid] = int(fields[1])
+        rss[pid] = int(fields[21]) * page_size
+    below = {os.getpid()}
+    changed = True
+    while changed:
+        changed = False
+        for pid, ppid in parents.items():
+            if ppid in below and pid not in below:
+                below.add(pid)
+                changed = True
+    below.discard(os.getpid())
+    return sum(rss[pid] for pid in below) / 2 ** 20
+
+
+def new_session():
+    return {"browser": None, "context": None, "context_navigations": 0, "browser_navigations": 0,
+            "rss_checked": time.monotonic(), "rss_mb": 0}
+
+
+def over(count, limit):
+    return limit and count >= limit
+
+
+def due(session):
+    # "browser", "context" or None
+    if MAX_BROWSER_RSS_MB and time.monotonic() - session["rss_checked"] >= RSS_INTERVAL_S:
+        session["rss_checked"] = time.monotonic()
+        session["rss_mb"] = children_rss_mb()
+        stats["peak_rss_mb"] = max(stats["peak_rss_mb"], round(session["rss_mb"]))
+    if over(session["browser_navigations"], BROWSER_NAVIGATIONS) or (MAX_BROWSER_RSS_MB and session["rss_mb"] > MAX_BROWSER_RSS_MB):
+        return "browser"
+    if over(session["context_navigations"], CONTEXT_NAVIGATIONS):
+        return "context"
+    return None
+
+
+def count(session, navigations):
+    session["context_navigations"] += navigations
+    session["browser_navigations"] += navigations
+
+
+def page_due(navigations):
+    return over(navigations, PAGE_NAVIGATIONS)
+
+
+def open_session(p, session, cookies, headless):
+    # Starts a session, or replaces whatever is due in a running one
+    reason = due(session) if session["browser"] else "browser"
+    if session["context"]:
+        session["context"].close()
+    if reason == "browser":
+        if session["browser"]:
+            session["browser"].close()
+        session["browser"] = p.chromium.launch(headless=headless)
+        session["browser_navigations"] = 0
+        session["rss_mb"] = 0
+        stats["browsers"] += 1
+    session["context"] = session["browser"].new_context()
+    session["context"].add_cookies(cookies)
+    session["context_navigations"] = 0
+    stats["contexts"] += 1
+    return session
+
+
+async def open_session_async(p, session, cookies, headless):
+    reason = due(session) if session["browser"] else "browser"
+    if session["context"]:
+        await session["context"].close()
+    if reason == "browser":
+        if session["browser"]:
+            await session["browser"].close()
+        session["browser"] = await p.chromium.launch(headless=headless)
+        session["browser_navigations"] = 0
+        session["rss_mb"] = 0
+        stats["browsers"] += 1
+    session["context"] = await session["browser"].new_context()
+    await session["context"].add_cookies(cookies)
+    session["context_navigations"] = 0
+    stats["contexts"] += 1
+    return session
+
+
+def close_session(session):
+    session["context"].close()
+    session["browser"].close()
+
+
+async def close_session_async(session):
+    await session["context"].close()
+    await session["browser"].close()
+
+
+def summary():
+    rss = f", peak browser RSS {stats['peak_rss_mb']} MB" if MAX_BROWSER_RSS_MB else ""
+    return f"{stats['browsers']} browsers, {stats['contexts']} contexts, {stats['pages']} replaced pages{rss}"
@@ -0,0 +1,165 @@
+import hashlib
+import json
+import re
+import time
+from pathlib import Path
+import writer
+
+# Append-only record of every scraped section in the output directory, one
+# JSON line per attempt. The last line for a profile/section is its current
+# state, so a restarted run with --resume skips sections that are done and
+# retries the ones that failed.
+MANIFEST = "manifest.jsonl"
+
+# A profile that doesn't exist is not retried; an auth wall is
+DONE = {"ok", "empty", "not_found"}
+
+# Refresh policy set with --ttl: how long a section stays fresh after it was
+# last scraped. Sections without a TTL are fetched on every run.
+TTLS = {}
+
+DURATION = re.compile(r"^(\d+(?:\.\d+)?)([smhdw]?)$")
+
+UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+# Per output directory: content hash of each section's last successful
+# result (None when empty), to tell which sections changed in this run
+content_hashes = {}
+
+# Entries of profiles still being scraped, per (output_dir, profile). They
+# reach the manifest only after the profile itself has been written, so
+# --resume never skips a section whose data was lost in a crash
+held = {}
+
+
+def manifest_path(output_dir):
+    return Path(output_dir) / MANIFEST
+
+
+def content_hash(section_json):
+    data = json.dumps(section_json, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def read_manifest(output_dir):
+    state = {}
+    path = manifest_path(output_dir)
+    if not path.exists():
+        return state
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # Last line cut short by a crash
+                continue
+            state[(entry["profile"], entry["section"])] = entry
+    return state
+
+
+def last_hashes(output_dir):
+    key = str(output_dir)
+    if key not in content_hashes:
+        content_hashes[key] = {
+            k: entry.get("hash") for k, entry in read_manifest(output_dir).items() if entry["status"] in DONE
+        }
+    return content_hashes[key]
+
+
+def record(output_dir, profile, section, status, section_json=None, error=None):
+    # Returns whether a done section differs from its last successful result
+    entry = {"profile": profile, "section": section, "status": status, "time": round(time.time(), 3)}
+    changed = None
+    if status in DONE:
+        hashes = last_hashes(output_dir)
+        digest = content_hash(section_json) if status == "ok" else None
+        changed = (profile, section) not in hashes or hashes[(profile, section)] != digest
+        hashes[(profile, section)] = digest
+        if digest:
+            entry["hash"] = digest
+        entry["changed"] = changed
+    if error:
+        entry["error"] = error
+    held.setdefault((str(output_dir), profile), []).append(json.dumps(entry) + "\n")
+    return changed
+
+
+def take(output_dir, profile):
+    # The held lines of a profile, to be written along with it
+    return held.pop((str(output_dir), profile), [])
+
+
+def append(output_dir, lines):
+    if not lines:
+        return None
+    path = manifest_path(output_dir)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("".join(lines))
+    return path
+
+
+def commit(output_dir, lines):
+    # For a profile that is already on disk as is
+    writer.submit(append, output_dir, lines)
+
+
+def pending(state, profile, sections):
+    return [s for s in sections if state.get((profile, s), {}).get("status") not in DONE]
+
+
+def parse_duration(value):
+    match = DURATION.match(value.strip().lower())
+    if not match:
+        raise ValueError(f"Invalid duration: {value}")
+    return float(match.group(1)) * UNITS[match.group(2)]
+
+
+def configure_ttls(values):
+    # [SECTION=]DURATION, e.g. main=1d experience=1w patents=30d; without a
+    # section the duration is the default for all of them
+    global TTLS
+    TTLS = {}
+    for value in values:
+        section, sep, duration = value.rpartition("=")
+        TTLS[section if sep else "default"] = parse_duration(duration)
+
+
+def stale(state, profile, sections, now=None):
+    now = now or time.time()
+    due = []
+    for section in sections:
+        entry = state.get((profile, section), {})
+        ttl = TTLS.get(section, TTLS.get("default"))
+        if entry.get("status") not in DONE or ttl is None or now - entry["time"] >= ttl:
+            due.append(section)
+    return due
+
+
+def settle(output_dir, profile, section, result, profile_json):
+    # result is the section JSON, or the exception raised while fetching it;
+    # a failed section keeps whatever profile_json already had for it.
+    # Returns whether the section changed, None if it failed
+    if isinstance(result, BaseException):
+        print(f"Failed to scrape {section} of {profile}: {result}")
+        record(output_dir, profile, section, "failed", error=repr(result))
+        return None
+    if result is None:
+        profile_json.pop(section, None)
+        return record(output_dir, profile, section, "empty")
+    profile_json[section] = result
+    return record(output_dir, profile, section, "ok", result)
+
+
+def record_unavailable(output_dir, profile, sections, reason):
+    print(f"Skipping {', '.join(sections)} of {profile}: {reason}")
+    for section in sections:
+        record(output_dir, profile, section, reason)
+
+
+def report_changes(profile, changes):
+    changed = [section for section, c in changes.items() if c]
+    if changed:
+        print(f"Changed sections of {profile}: {', '.join(changed)}")
+    else:
+        print(f"No changes in {profile}")
+    return changed
@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from functools import lru_cache
+from pathlib import Path
+from sections import load
+import writer
+
+# Parsed sections cached by the hash of their normalized HTML. A snapshot that
+# only differs from the last one in volatile markup (Ember IDs, tracking
+# attributes, empty comments) is neither rewritten nor parsed again. Kept in
+# .memo/ in the output directory: index.jsonl maps each snapshot to the hash
+# it was last written with, {hash}.json holds the parsed result.
+MEMO_DIR = ".memo"
+
+ENABLED = True
+
+VOLATILE = [
+    re.compile(r"\bember\d+\b"),
+    re.compile(r'\s(?:id|data-view-tracking-scope|data-finite-scroll-hotkey-context|data-test-[\w-]+)="[^"]*"'),
+    re.compile(r"<!---->"),
+    re.compile(r"\s+")
+]
+
+MISSING = object()
+
+indexes = {}
+
+
+def normalize(html):
+    for pattern in VOLATILE[:-1]:
+        html = pattern.sub("", html)
+    return VOLATILE[-1].sub(" ", html).strip()
+
+
+@lru_cache(maxsize=None)
+def parser_version(section):
+    # Source of the section module, the spec engine and the parser adapters,
+    # so a parser change invalidates results cached by the previous version
+    digest = hashlib.sha256()
+    here = Path(__file__).parent
+    for path in (load(section).__file__, here / "specs.py", here / "dom.py"):
+        digest.update(Path(path).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def snapshot_hash(section, html):
+    digest = hashlib.sha256(f"{section}\0{parser_version(section)}\0".encode("utf-8"))
+    digest.update(normalize(html).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def memo_dir(output_dir):
+    path = Path(output_dir) / MEMO_DIR
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def read_index(output_dir):
+    key = str(output_dir)
+    if key not in indexes:
+        index = {}
+        path = Path(output_dir) / MEMO_DIR / "index.jsonl"
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    index[entry["snapshot"]] = entry["hash"]
+        indexes[key] = index
+    return indexes[key]
+
+
+def unchanged(output_dir, profile, section, digest):
+    return read_index(output_dir).get(f"{profile}.{section}") == digest
+
+
+def append_index(output_dir, line):
+    path = memo_dir(output_dir) / "index.jsonl"
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(line)
+    return path
+
+
+def remember_snapshot(output_dir, profile, section, digest):
+    read_index(output_dir)[f"{profile}.{section}"] = digest
+    writer.submit(append_index, output_dir, json.dumps({"snapshot": f"{profile}.{section}", "hash": digest}) + "\n")
+
+
+def cached(output_dir, digest):
+    path = Path(output_dir) / MEMO_DIR / f"{digest}.json"
+    if not path.exists():
+        return MISSING
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_result(output_dir, digest, section_json):
+    # Renamed into place, so cached() never reads a half-written result; the
+    # temporary name is per process, as shard workers share .memo/
+    path = memo_dir(output_dir) / f"{digest}.json"
+    tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(section_json, f)
+    os.replace(tmp, path)
+    return path
+
+
+def store(output_dir, digest, section_json):
+    writer.submit(write_result, output_dir, digest, section_json)
@@ -0,0 +1,39 @@
+import json
+from pathlib import Path
+import writer
+
+# Profiles handed to the background writer that aren't on disk yet; reading
+# one back returns the queued version
+queued = {}
+
+
+def read_profile(output_dir, profile):
+    pending = queued.get((str(output_dir), profile))
+    if pending is not None:
+        return json.loads(json.dumps(pending))
+    json_path = Path(output_dir) / f"{profile}.json"
+    if not json_path.exists():
+        return {}
+    with open(json_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_profile(output_dir, profile, profile_json):
+    path = Path(output_dir) / f"{profile}.json"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(profile_json, f, indent=2)
+    return path
+
+
+def hold(output_dir, profile, profile_json):
+    # Called before a write of the profile is queued
+    if writer.ENABLED:
+        queued[(str(output_dir), profile)] = profile_json
+
+
+def write_queued(output_dir, profile, profile_json):
+    path = write_profile(output_dir, profile, profile_json)
+    key = (str(output_dir), profile)
+    if queued.get(key) is profile_json:
+        queued.pop(key, None)
+    return path
@@ -0,0 +1,152 @@
+import asyncio
+import random
+import re
+import time
+from collections import Counter
+from playwright.sync_api import Error as PlaywrightError
+
+# Every navigation goes through goto()/goto_async(), which paces them with a
+# token bucket per account (cookie set). The rate adapts AIMD style: it
+# creeps up by INCREASE after each fast, clean response, drops when pages get
+# slower than LATENCY_TARGET_MS, and is cut by DECREASE when the site
+# throttles us, after which the navigation is retried with jittered
+# exponential backoff.
+
+# Navigations per second per account; 0 disables pacing
+RATE = 0.5
+MIN_RATE = 0.05
+MAX_RATE = 2.0
+BURST = 3
+
+INCREASE = 0.02
+DECREASE = 0.5
+LATENCY_TARGET_MS = 4000
+
+RETRIES = 3
+BACKOFF_BASE_S = 5
+BACKOFF_MAX_S = 300
+
+# Set from --cookies so each cookie set gets its own bucket
+ACCOUNT = "default"
+
+# 999 is what LinkedIn answers with when it rate limits a session
+THROTTLE_STATUS = {429, 999}
+
+BLOCKED_URL = re.compile(r"/(checkpoint|authwall)\b|/uas/login|/login\b")
+
+buckets = {}
+
+stats = Counter()
+
+
+def bucket(account=None):
+    account = account or ACCOUNT
+    if account not in buckets:
+        buckets[account] = {"rate": RATE, "tokens": BURST, "last": time.monotonic(), "failures": 0, "latency": None}
+    return buckets[account]
+
+
+def reserve(b):
+    # Takes a token now and returns how long to wait until it is covered, so
+    # concurrent callers queue up behind each other without a lock
+    if RATE <= 0:
+        return 0.0
+    now = time.monotonic()
+    b["tokens"] = min(BURST, b["tokens"] + (now - b["last"]) * b["rate"])
+    b["last"] = now
+    b["tokens"] -= 1
+    return max(0.0, -b["tokens"] / b["rate"])
+
+
+def throttle_reason(page, response):
+    if BLOCKED_URL.search(page.url):
+        return "checkpoint"
+    if response is None:
+        return None
+    if response.status in THROTTLE_STATUS:
+        return f"status {response.status}"
+    if response.status >= 500:
+        return f"status {response.status}"
+    return None
+
+
+def backoff(failures):
+    delay = min(BACKOFF_MAX_S, BACKOFF_BASE_S * 2 ** (failures - 1))
+    return random.uniform(delay / 2, delay)
+
+
+def observe(b, reason, latency_ms):
+    # Returns how long to back off before retrying, 0 if the navigation was fine
+    stats["navigations"] += 1
+    if reason:
+        stats[reason] += 1
+        b["failures"] += 1
+        b["rate"] = max(MIN_RATE, b["rate"] * DECREASE)
+        return backoff(b["failures"])
+
+    b["failures"] = 0
+    b["latency"] = latency_ms if b["latency"] is None else 0.8 * b["latency"] + 0.2 * latency_ms
+    if b["latency"] > LATENCY_TARGET_MS:
+        b["rate"] = max(MIN_RATE, b["rate"] * 0.9)
+    else:
+        b["rate"] = min(MAX_RATE, b["rate"] + INCREASE)
+    return 0
+
+
+def goto(page, url, **kwargs):
+    b = bucket()
+    for attempt in range(RETRIES + 1):
+        wait = reserve(b)
+        stats["waited_s"] += wait
+        time.sleep(wait)
+        start = time.perf_counter()
+        error = None
+        try:
+            response = page.goto(url, **kwargs)
+            reason = throttle_reason(page, response)
+        except PlaywrightError as e:
+            response, reason, error = None, "error", e
+        delay = observe(b, reason, (time.perf_counter() - start) * 1000)
+        # Another try won't get past an auth wall; the caller deals with it
+        if not reason or reason == "checkpoint" or attempt == RETRIES:
+            break
+        stats["waited_s"] += delay
+        time.sleep(delay)
+    if error:
+        raise error
+    return response
+
+
+async def goto_async(page, url, **kwargs):
+    b = bucket()
+    for attempt in range(RETRIES + 1):
+        wait = reserve(b)
+        stats["waited_s"] += wait
+        await asyncio.sleep(wait)
+        start = time.perf_counter()
+        error = None
+        try:
+            response = await page.goto(url, **kwargs)
+            reason = throttle_reason(page, response)
+        except PlaywrightError as e:
+            response, reason, error = None, "error", e
+        delay = observe(b, reason, (time.perf_counter() - start) * 1000)
+        # Another try won't get past an auth wall; the caller deals with it
+        if not reason or reason == "checkpoint" or attempt == RETRIES:
+            break
+        stats["waited_s"] += delay
+        await asyncio.sleep(delay)
+    if error:
+        raise error
+    return response
+
+
+def summary():
+    if not stats["navigations"]:
+        return "No navigations"
+    problems = ", ".join(f"{k}: {v}" for k, v in stats.items() if k not in ("navigations", "waited_s"))
+    rates = ", ".join(f"{account}: {b['rate']:.2f}/s" for account, b in buckets.items())
+    return (
+        f"{stats['navigations']} navigations, {stats['waited_s']:.1f}s summed waits for pacing and backoff "
+        f"({problems or 'no throttling'}); current rate {rates}"
+    )
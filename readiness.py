@@ -0,0 +1,110 @@
+import random
+import time
+from collections import Counter
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+# Upper bound for any single wait, overridable with --wait-timeout
+TIMEOUT_MS = 5000
+
+# How long the resource list has to stay unchanged to count as network idle
+QUIET_MS = 500
+
+EMPTY_SELECTOR = ".artdeco-empty-state"
+
+READY_JS = """
+([selector, empty, quietMs]) => {
+    if (selector && document.querySelector(selector)) return "ready";
+    if (empty && document.querySelector(empty)) return "empty";
+    if (document.readyState !== "complete") return false;
+
+    const count = performance.getEntriesByType("resource").length;
+    const now = performance.now();
+    const quiet = window.__liScraperQuiet || (window.__liScraperQuiet = {count: -1, since: now});
+    if (quiet.count !== count) {
+        quiet.count = count;
+        quiet.since = now;
+        return false;
+    }
+    return now - quiet.since >= quietMs ? "idle" : false;
+}
+"""
+
+# Count, max and reasons over every wait, and a fixed-size random sample of
+# wait times for the median, so long runs don't grow it
+waits = {"count": 0, "sum": 0.0, "max": 0.0, "reasons": Counter(), "sample": []}
+
+SAMPLE_SIZE = 4096
+
+
+def record(url, reason, start):
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    waits["count"] += 1
+    waits["sum"] += elapsed_ms
+    waits["max"] = max(waits["max"], elapsed_ms)
+    waits["reasons"][reason] += 1
+    # Reservoir sampling, as in timing.observe
+    if len(waits["sample"]) < SAMPLE_SIZE:
+        waits["sample"].append(elapsed_ms)
+    else:
+        i = random.randrange(waits["count"])
+        if i < SAMPLE_SIZE:
+            waits["sample"][i] = elapsed_ms
+    return elapsed_ms
+
+
+def wait_ready(page, selector, empty=EMPTY_SELECTOR, timeout=None):
+    timeout = TIMEOUT_MS if timeout is None else timeout
+    start = time.perf_counter()
+    try:
+        handle = page.wait_for_function(READY_JS, arg=[selector, empty, QUIET_MS], polling=100, timeout=timeout)
+        reason = handle.json_value()
+    except PlaywrightTimeoutError:
+        reason = "timeout"
+    record(page.url, reason, start)
+    return reason
+
+
+def wait_hidden(page, selector, timeout=None):
+    timeout = TIMEOUT_MS if timeout is None else timeout
+    start = time.perf_counter()
+    try:
+        page.wait_for_selector(selector, state="hidden", timeout=timeout)
+        reason = "hidden"
+    except PlaywrightTimeoutError:
+        reason = "timeout"
+    record(page.url, reason, start)
+    return reason
+
+
+async def wait_ready_async(page, selector, empty=EMPTY_SELECTOR, timeout=None):
+    timeout = TIMEOUT_MS if timeout is None else timeout
+    start = time.perf_counter()
+    try:
+        handle = await page.wait_for_function(READY_JS, arg=[selector, empty, QUIET_MS], polling=100, timeout=timeout)
+        reason = await handle.json_value()
+    except PlaywrightTimeoutError:
+        reason = "timeout"
+    record(page.url, reason, start)
+    return reason
+
+
+async def wait_hidden_async(page, selector, timeout=None):
+    timeout = TIMEOUT_MS if timeout is None else timeout
+    start = time.perf_counter()
+    try:
+        await page.wait_for_selector(selector, state="hidden", timeout=timeout)
+        reason = "hidden"
+    except PlaywrightTimeoutError:
+        reason = "timeout"
+    record(page.url, reason, start)
+    return reason
+
+
+def summary():
+    if not waits["count"]:
+        return "No readiness waits recorded"
+    times = sorted(waits["sample"])
+    return (
+        f"{waits['count']} waits, median {times[len(times) // 2]:.0f} ms, mean {waits['sum'] / waits['count']:.0f} ms, "
+        f"max {waits['max']:.0f} ms ({', '.join(f'{k}: {v}' for k, v in waits['reasons'].most_common())})"
+    )
@@ -0,0 +1,56 @@
+import json
+import os
+import dom
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from output import read_profile, write_profile
+from sections import SECTIONS, load
+from snapshots import find_snapshots, read_snapshot, iter_snapshots
+
+
+def reparse_profile(profile, paths, output_dir):
+    # Keep sections we have no snapshot for, e.g. from an older run
+    profile_json = read_profile(output_dir, profile)
+
+    for section in SECTIONS:
+        if section not in paths:
+            continue
+        html = read_snapshot(output_dir, paths[section])
+        section_json = load(section).extract(html)
+        if section_json is not None:
+            profile_json[section] = section_json
+        else:
+            profile_json.pop(section, None)
+
+    write_profile(output_dir, profile, profile_json)
+
+    return profile
+
+
+def use_backend(backend):
+    dom.BACKEND = backend
+
+
+def reparse(input_dir, workers=None):
+    snapshots = find_snapshots(input_dir)
+    profiles = list(snapshots)
+    chunksize = max(1, len(profiles) // ((workers or os.cpu_count() or 1) * 16))
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=use_backend, initargs=(dom.BACKEND,)) as pool:
+        done = pool.map(reparse_profile, profiles, (snapshots[p] for p in profiles), repeat(input_dir), chunksize=chunksize)
+        return sum(1 for _ in done)
+
+
+def parity(input_dir, backends=None):
+    backends = backends or dom.BACKENDS
+    mismatches = []
+    checked = 0
+    for profile, section, html in iter_snapshots(input_dir):
+        results = {}
+        for backend in backends:
+            dom.BACKEND = backend
+            results[backend] = json.dumps(load(section).extract(html), sort_keys=True)
+        checked += 1
+        if len(set(results.values())) > 1:
+            mismatches.append({"profile": profile, "section": section, "results": results})
+    return checked, mismatches
@@ -0,0 +1,101 @@
+import argparse
+import json
+import re
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from api import fixture_path
+from snapshots import load_snapshot
+
+# Local stand-in for linkedin.com that replays a recorded run: each section
+# page first requests its recorded {profile}.{section}.api.json payloads from
+# /voyager/api/replay/..., then renders the saved HTML snapshot, the same
+# order in which the real site renders from its API responses. Point
+# scrape.py at it with --base-url http://127.0.0.1:PORT.
+
+PROFILE_PATH = re.compile(r"^/in/([^/]+)/?$")
+DETAILS_PATH = re.compile(r"^/in/([^/]+)/details/([^/]+)/?$")
+API_PATH = re.compile(r"^/voyager/api/replay/([^/]+)/([^/]+)/(\d+)$")
+
+PAGE = """<!DOCTYPE html>
+<html><head><title>{profile}</title></head>
+<body>
+<script>
+Promise.all(Array.from({{length: {count}}}, (_, i) => fetch("/voyager/api/replay/{profile}/{section}/" + i)))
+    .catch(() => null)
+    .then(() => {{ document.body.innerHTML = {html}; }});
+</script>
+</body></html>
+"""
+
+
+def load_payloads(input_dir, profile, section):
+    path = fixture_path(input_dir, profile, section)
+    if not path.exists():
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def render(input_dir, profile, section):
+    html = load_snapshot(input_dir, profile, section) or ""
+    if section != "main":
+        html = f"<main>{html}</main>"
+    else:
+        # Full page snapshot; only its body is re-rendered
+        match = re.search(r"<body[^>]*>(.*)</body>", html, re.S | re.I)
+        html = match.group(1) if match else html
+    count = len(load_payloads(input_dir, profile, section))
+    # Keep tags in the snapshot from being parsed as part of the loader script
+    html = json.dumps(html).replace("<", "\\u003c")
+    return PAGE.format(profile=profile, section=section, count=count, html=html)
+
+
+def make_handler(input_dir):
+    class ReplayHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split("?", 1)[0]
+            if match := PROFILE_PATH.match(path):
+                self.send(200, "text/html; charset=utf-8", render(input_dir, match.group(1), "main"))
+            elif match := DETAILS_PATH.match(path):
+                self.send(200, "text/html; charset=utf-8", render(input_dir, match.group(1), match.group(2)))
+            elif match := API_PATH.match(path):
+                payloads = load_payloads(input_dir, match.group(1), match.group(2))
+                n = int(match.group(3))
+                if n < len(payloads):
+                    self.send(200, "application/json", json.dumps(payloads[n]))
+                else:
+                    self.send(404, "application/json", "{}")
+            else:
+                self.send(404, "text/plain", "Not found")
+
+        def send(self, status, content_type, body):
+            body = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ReplayHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded profile pages and API responses on a local server")
+    parser.add_argument("--input", default="output", help="Directory holding snapshots and {profile}.{section}.api.json fixtures")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(args.input))
+    print(f"Replaying {args.input} on http://127.0.0.1:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import re
+from collections import Counter
+from weakref import WeakSet
+
+TRACKERS = [re.compile(p) for p in [
+    r"://[^/]*doubleclick\.net/",
+    r"://[^/]*google-analytics\.com/",
+    r"://[^/]*googletagmanager\.com/",
+    r"://[^/]*bat\.bing\.com/",
+    r"://px\.ads\.linkedin\.com/",
+    r"://[^/]*linkedin\.com/(li/track|sensorCollect|tscp-serving)",
+    r"://[^/]*linkedin\.com/realtime/"
+]]
+
+# The parsers only read text from the DOM, so nothing a section needs is lost
+# by dropping these. Stylesheets stay: the "see more" button is only clicked
+# when it is visible.
+POLICY = {
+    "types": {"image", "media", "font"},
+    "urls": TRACKERS
+}
+
+# Per-section overrides of POLICY, filled from --block SECTION=TYPES
+SECTION_POLICIES = {}
+
+stats = {
+    "blocked": Counter(),
+    "loaded": 0,
+    "loaded_bytes": 0
+}
+
+metered_pages = WeakSet()
+
+
+def parse_policy(value):
+    types = set(t.strip() for t in value.split(",") if t.strip())
+    if types == {"none"}:
+        return None
+    return {"types": types - {"trackers"}, "urls": TRACKERS if "trackers" in types else []}
+
+
+def configure(values):
+    global POLICY
+    for value in values:
+        section, sep, types = value.rpartition("=")
+        if sep:
+            SECTION_POLICIES[section] = parse_policy(types)
+        else:
+            POLICY = parse_policy(types)
+
+
+def policy_for(section):
+    return SECTION_POLICIES.get(section, POLICY)
+
+
+def blocks(policy, request):
+    if request.resource_type in policy["types"]:
+        return True
+    return any(pattern.search(request.url) for pattern in policy["urls"])
+
+
+def meter(response):
+    stats["loaded"] += 1
+    length = response.headers.get("content-length")
+    if length and length.isdigit():
+        stats["loaded_bytes"] += int(length)
+
+
+def route(page, section):
+    policy = policy_for(section)
+    if page not in metered_pages:
+        page.on("response", meter)
+        metered_pages.add(page)
+
+    def handle(route):
+        if blocks(policy, route.request):
+            stats["blocked"][route.request.resource_type] += 1
+            route.abort()
+        else:
+            route.continue_()
+
+    page.unroute("**/*")
+    if policy:
+        page.route("**/*", handle)
+
+
+async def route_async(page, section):
+    policy = policy_for(section)
+    if page not in metered_pages:
+        page.on("response", meter)
+        metered_pages.add(page)
+
+    async def handle(route):
+        if blocks(policy, route.request):
+            stats["blocked"][route.request.resource_type] += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    await page.unroute("**/*")
+    if policy:
+        await page.route("**/*", handle)
+
+
+def summary():
+    blocked = stats["blocked"]
+    by_type = ", ".join(f"{k}: {v}" for k, v in blocked.most_common())
+    return (
+        f"blocked {sum(blocked.values())} requests ({by_type or 'none'}), "
+        f"loaded {stats['loaded']} responses / {stats['loaded_bytes'] / 1024:.0f} KB by content-length"
+    )
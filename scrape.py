@@ -1,7 +1,7 @@
 import json
 import argparse
-import os
-from pathlib import Path
+import asyncio
+import signal
 from playwright.sync_api import sync_playwright
 from sections.main import parse as parse_main
 from sections.experience import parse as parse_experience
@@ -11,6 +11,23 @@ from sections.skills import parse as parse_skills
 from sections.recommendations import parse as parse_recommendations
 from sections.publications import parse as parse_publications
 from sections.patents import parse as parse_patents
+from fetch import Unavailable
+from reparse import reparse, parity
+import dom
+import engine
+import fetch
+import frontier
+import governor
+import manifest
+import memo
+import ratelimit
+import readiness
+import resources
+import sinks
+import snapshots
+import timing
+import writer
+from sections import SECTIONS
 
 VALID_SAMESITE = {"Strict", "Lax", "None"}
 
@@ -27,42 +44,70 @@ def scrape_section(context, profile, section, output_dir):
     return section_json
 
 
-def scrape_profile(context, profile, output_dir):
-    sections = [
-        "main",
-        # "experience",
-        # "education",
-        # "certifications",
-        # "skills",
-        # "recommendations",
-        # "publications",
-        # "patents"
-    ]
+PROFILE_SECTIONS = [
+    "main",
+    # "experience",
+    # "education",
+    # "certifications",
+    # "skills",
+    # "recommendations",
+    # "publications",
+    # "patents"
+]
+
 
-    profile_json = {}
-    os.makedirs(output_dir, exist_ok=True)
+def scrape_profile(context, profile, output_dir, sections=PROFILE_SECTIONS, merge=False):
+    profile_json, stored = engine.start_profile(output_dir, profile, merge)
 
+    results = {}
     for section in sections:
-        section_json = scrape_section(context, profile, section, output_dir)
-        if section_json is not None:
-            profile_json[section] = section_json
+        try:
+            results[section] = scrape_section(context, profile, section, output_dir)
+        except Exception as e:
+            results[section] = e
+        if isinstance(results[section], Unavailable):
+            # None of the remaining pages of this profile will load either
+            break
 
-    with open(Path(output_dir) / f"{profile}.json", "w", encoding="utf-8") as f:
-        json.dump(profile_json, f, indent=2)
+    return engine.finish_profile(output_dir, profile, sections, results, profile_json, stored, merge)
 
 
+def configure(args):
+    dom.BACKEND = args.parser
+    readiness.TIMEOUT_MS = args.wait_timeout
+    fetch.EXTRACT_MODE = args.extract
+    fetch.SNAPSHOT_RATE = args.snapshot_rate
+    fetch.USE_API = args.api or args.record_api
+    fetch.RECORD_API = args.record_api
+    fetch.BASE_URL = args.base_url.rstrip("/")
+    memo.ENABLED = not args.no_memo
+    snapshots.FORMAT = args.snapshots
+    sinks.SINK = args.sink
+    sinks.BATCH = args.sink_batch
+    resources.configure(args.block)
+    ratelimit.RATE = args.rate
+    ratelimit.MAX_RATE = max(args.max_rate, args.rate)
+    ratelimit.ACCOUNT = args.cookies[0]
+    timing.KEEP_SPANS = bool(args.stats or args.trace or args.chrome_trace)
+    governor.PAGE_NAVIGATIONS = args.recycle_page
+    governor.CONTEXT_NAVIGATIONS = args.recycle_context
+    governor.BROWSER_NAVIGATIONS = args.recycle_browser
+    governor.MAX_BROWSER_RSS_MB = args.max_browser_rss
+    writer.ENABLED = args.write_queue > 0
+    writer.QUEUE_SIZE = args.write_queue
+    writer.FSYNC_EVERY = args.fsync_every
 
-def main():
-    parser = argparse.ArgumentParser(description="Scrape LinkedIn profile sections")
-    parser.add_argument("--profiles", nargs="+", required=True, help="List of LinkedIn profile IDs to scrape")
-    parser.add_argument("--cookies", default="linkedin_cookies.json", help="Path to the LinkedIn cookies JSON file")
-    parser.add_argument("--output", default="output", help="Directory to save output files")
-    args = parser.parse_args()
 
-    with open(args.cookies, "r") as f:
+def terminate(signum, frame):
+    # Unwinds like Ctrl-C, so buffered profiles and queued writes are flushed
+    raise SystemExit(128 + signum)
+
+
+def load_cookies(path):
+    with open(path, "r") as f:
         raw_cookies = json.load(f)
 
-    cookies = [
+    return [
         {
             "name": c["name"],
             "value": c["value"],
@@ -75,16 +120,263 @@ def main():
         for c in raw_cookies if ".linkedin.com" in c.get("domain", "")
     ]
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False)
-        context = browser.new_context()
-        context.add_cookies(cookies)
 
-        for profile in args.profiles:
-            scrape_profile(context, profile, args.output)
+def scrape_jobs(args, cookies, jobs, merge):
+    # Buffered profiles are written even when the run is cut short
+    try:
+        blocked = run_jobs(args, cookies, jobs, merge)
+    finally:
+        sinks.close(args.output)
+    report(args)
+    if blocked:
+        raise SystemExit("Stopped at an auth wall; the cookies need to be renewed")
+
+
+def run_jobs(args, cookies, jobs, merge):
+    # Returns whether the run stopped at an auth wall
+    if args.concurrency > 1 or args.parallel_sections:
+        return asyncio.run(engine.run(jobs, cookies, args.output, args.concurrency, args.parallel_sections, args.headless, merge))
+    else:
+        with sync_playwright() as p:
+            session = governor.open_session(p, governor.new_session(), cookies, args.headless)
+            navigations = 0
+            blocked = False
+
+            for profile, sections in jobs:
+                profile_json = scrape_profile(session["context"], profile, args.output, sections, merge)
+                if profile_json.get("status") == "authwall":
+                    # Expired cookies don't come back; the remaining profiles
+                    # stay pending in the manifest
+                    print(f"Auth wall at {profile}, stopping")
+                    blocked = True
+                    break
+                governor.count(session, len(sections))
+                navigations += len(sections)
+                if governor.due(session):
+                    governor.open_session(p, session, cookies, args.headless)
+                    navigations = 0
+                elif governor.page_due(navigations) and session["context"].pages:
+                    # The section parsers open a fresh page when none is left
+                    session["context"].pages[0].close()
+                    navigations = 0
+                    governor.stats["pages"] += 1
+
+            governor.close_session(session)
+            return blocked
+
+
+def crawl(args, cookies):
+    # Recommendations are where new profiles come from
+    sections = list(dict.fromkeys([*args.sections, "recommendations"]))
+    frontier.MAX_DEPTH = args.depth
+    frontier.ACTIVE = frontier.open_frontier(args.output)
+    seeded = frontier.add(frontier.ACTIVE, [frontier.normalize(p) for p in args.profiles or []], 0)
+    print(f"Seeded {seeded} new profiles, {frontier.size(frontier.ACTIVE)[0]} queued")
+
+    scraped = 0
+    blocked = False
+    try:
+        while not args.max_profiles or scraped < args.max_profiles:
+            count = min(args.batch, args.max_profiles - scraped) if args.max_profiles else args.batch
+            profiles = frontier.claim(frontier.ACTIVE, count)
+            if not profiles:
+                break
+            blocked = run_jobs(args, cookies, [(profile, sections) for profile in profiles], False)
+            scraped += len(profiles)
+            print(f"Crawled {scraped} profiles, {frontier.size(frontier.ACTIVE)[0]} queued")
+            if blocked:
+                break
+    finally:
+        sinks.close(args.output)
+    report(args)
+    print(f"Frontier: {frontier.summary(frontier.ACTIVE)}")
+    if blocked:
+        raise SystemExit("Stopped at an auth wall; the cookies need to be renewed")
+
+
+def report(args):
+    print(f"Readiness: {readiness.summary()}")
+    print(f"Resources: {resources.summary()}")
+    print(f"Rate limit: {ratelimit.summary()}")
+    print(f"Stages: {timing.summary()}")
+    print(f"Recycling: {governor.summary()}")
+    print(f"Disk writes: {writer.summary()}")
+    if args.stats:
+        timing.write_stats(args.stats)
+    if args.trace:
+        timing.write_trace(args.trace)
+    if args.chrome_trace:
+        timing.write_chrome_trace(args.chrome_trace)
+    if args.prometheus:
+        timing.write_prometheus(args.prometheus)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape LinkedIn profile sections")
+    parser.add_argument("--profiles", nargs="+", help="List of LinkedIn profile IDs to scrape")
+    parser.add_argument("--cookies", nargs="+", default=["linkedin_cookies.json"],
+                        help="LinkedIn cookies JSON file; with several, profiles are sharded across one worker process per account")
+    parser.add_argument("--output", default="output", help="Directory to save output files")
+    parser.add_argument("--sections", nargs="+", choices=SECTIONS, default=PROFILE_SECTIONS, help="Sections to scrape for every profile")
+    parser.add_argument("--headless", action="store_true", help="Run Chromium without a window")
+    parser.add_argument("--stats", help="Write per-section fetch times as JSONL to this file")
+    parser.add_argument("--trace", help="Write a JSONL span for every scraping stage to this file")
+    parser.add_argument("--chrome-trace", help="Write the stage spans as a Chrome trace-event file (chrome://tracing, Perfetto)")
+    parser.add_argument("--prometheus", help="Write stage timing histograms to this Prometheus textfile")
+    parser.add_argument("--resume", action="store_true",
+                        help="Skip sections the output manifest records as done and retry failed ones, merging into existing JSON")
+    parser.add_argument("--ttl", action="append", default=[], metavar="[SECTION=]DURATION",
+                        help="Only refetch sections last scraped longer ago than this (e.g. main=1d, experience=1w, patents=30d), "
+                             "merging them into the existing JSON")
+    parser.add_argument("--no-memo", action="store_true",
+                        help="Always rewrite and reparse snapshots, even when their normalized HTML is unchanged")
+    parser.add_argument("--snapshots", choices=snapshots.FORMATS, default=snapshots.FORMAT,
+                        help="Save section HTML as plain .html files, or compressed and deduplicated in a packed snapshot store")
+    parser.add_argument("--sink", choices=sinks.SINKS, default=sinks.SINK,
+                        help="Write profiles as {profile}.json files, to an append-only profiles.jsonl[.gz] stream, or to profiles.db (SQLite)")
+    parser.add_argument("--sink-batch", type=int, default=sinks.BATCH, help="Profiles buffered per jsonl/sqlite write")
+    parser.add_argument("--write-queue", type=int, default=writer.QUEUE_SIZE,
+                        help="Writes queued for the background writer before scraping waits on disk (0: write inline)")
+    parser.add_argument("--fsync-every", type=int, default=writer.FSYNC_EVERY,
+                        help="Fsync written files after this many background writes (0: leave it to the OS)")
+    parser.add_argument("--rate", type=float, default=ratelimit.RATE,
+                        help="Starting navigations per second per account, adapted to how the site responds (0 disables pacing)")
+    parser.add_argument("--max-rate", type=float, default=ratelimit.MAX_RATE, help="Ceiling for the adaptive navigation rate")
+    parser.add_argument("--recycle-page", type=int, default=governor.PAGE_NAVIGATIONS, help="Replace a worker's page after this many navigations (0: never)")
+    parser.add_argument("--recycle-context", type=int, default=governor.CONTEXT_NAVIGATIONS,
+                        help="Replace the browser context, reloading cookies, after this many navigations (0: never)")
+    parser.add_argument("--recycle-browser", type=int, default=governor.BROWSER_NAVIGATIONS, help="Restart the browser after this many navigations (0: never)")
+    parser.add_argument("--max-browser-rss", type=int, default=governor.MAX_BROWSER_RSS_MB,
+                        help="Restart the browser once its processes use more than this many MB (0: no limit)")
+    parser.add_argument("--concurrency", type=int, default=1, help="Number of profiles to scrape at once (1 keeps the sequential path)")
+    parser.add_argument("--parallel-sections", action="store_true", help="Load all sections of a profile at once in sibling tabs")
+    parser.add_argument("--wait-timeout", type=int, default=readiness.TIMEOUT_MS, help="Maximum time in ms to wait for a section to become ready")
+    parser.add_argument("--parser", choices=dom.BACKENDS, default=dom.BACKEND, help="HTML parser backend for section extraction")
+    parser.add_argument("--extract", choices=["html", "browser"], default=fetch.EXTRACT_MODE,
+                        help="Parse section HTML in Python, or run the field specs inside the page and return only records")
+    parser.add_argument("--snapshot-rate", type=float, default=fetch.SNAPSHOT_RATE,
+                        help="With --extract browser, share of profiles (0-1) whose HTML snapshots are still saved")
+    parser.add_argument("--api", action="store_true", help="Build sections from captured Voyager API responses, falling back to the DOM")
+    parser.add_argument("--record-api", action="store_true", help="Save captured API responses as {profile}.{section}.api.json fixtures")
+    parser.add_argument("--base-url", default=fetch.BASE_URL, help="Site to scrape, e.g. a local replay server")
+    parser.add_argument("--block", action="append", default=[], metavar="[SECTION=]TYPES",
+                        help="Comma-separated resource types to abort (plus 'trackers', or 'none'), optionally for one section only; "
+                             "defaults to image,media,font,trackers")
+    subparsers = parser.add_subparsers(dest="command")
+    reparse_parser = subparsers.add_parser("reparse", help="Rebuild profile JSON from saved HTML snapshots")
+    reparse_parser.add_argument("--input", default="output", help="Directory holding the {profile}.{section}.html snapshots")
+    reparse_parser.add_argument("--workers", type=int, help="Number of parser processes (defaults to the CPU count)")
+    pack_parser = subparsers.add_parser("pack", help="Move saved .html snapshots into the compressed snapshot store")
+    pack_parser.add_argument("--input", default="output", help="Directory holding the {profile}.{section}.html snapshots")
+    export_parser = subparsers.add_parser("export", help="Flatten scraped profiles into Parquet tables (needs pyarrow)")
+    export_parser.add_argument("--input", default="output", help="Directory holding {profile}.json files or a profiles.jsonl sink")
+    export_parser.add_argument("--output", dest="export_dir", default="export", help="Directory for the .parquet tables")
+    analytics_parser = subparsers.add_parser("analytics", help="Tenure, overlap and transition analytics over exported tables (needs pandas)")
+    analytics_parser.add_argument("--input", default="export", help="Directory holding the tables written by export")
+    analytics_parser.add_argument("--output", dest="analytics_dir", help="Also save the results as .parquet files here")
+    daemon_parser = subparsers.add_parser("daemon", help="Keep a warm browser and scrape profiles requested over local HTTP")
+    daemon_parser.add_argument("--port", type=int, default=8765, help="Port to listen on (127.0.0.1 only)")
+    daemon_parser.add_argument("--headed", action="store_true", help="Show the browser window")
+    crawl_parser = subparsers.add_parser("crawl", help="Scrape the given profiles, then the profiles their recommendations link to, "
+                                                       "shallowest and most recommended first")
+    crawl_parser.add_argument("--depth", type=int, default=frontier.MAX_DEPTH, help="Follow recommendation links this many hops from the seeds")
+    crawl_parser.add_argument("--batch", type=int, default=100, help="Profiles taken from the frontier per browser session")
+    crawl_parser.add_argument("--max-profiles", type=int, default=0, help="Stop after this many profiles (0: when the frontier is empty)")
+    parity_parser = subparsers.add_parser("parity", help="Check that all parser backends extract identical JSON from saved snapshots")
+    parity_parser.add_argument("--input", default="output", help="Directory holding the {profile}.{section}.html snapshots")
+    args = parser.parse_args()
+
+    dom.BACKEND = args.parser
+
+    if args.command == "parity":
+        checked, mismatches = parity(args.input)
+        for m in mismatches:
+            print(f"Mismatch in {m['profile']}.{m['section']}:")
+            for backend, result in m["results"].items():
+                print(f"  {backend}: {result}")
+        print(f"Checked {checked} snapshots, {len(mismatches)} mismatches")
+        raise SystemExit(1 if mismatches else 0)
+
+    if args.command == "pack":
+        count = snapshots.pack(args.input)
+        print(f"Packed {count} snapshots into {snapshots.store_dir(args.input)}")
+        return
+
+    if args.command == "export":
+        from export import export
+        for table, rows in export(args.input, args.export_dir).items():
+            print(f"{table}: {rows} rows")
+        return
+
+    if args.command == "analytics":
+        from analytics import analyze
+        results = analyze(args.input, args.analytics_dir)
+        for name, frame in results.items():
+            print(f"{name} ({len(frame)} rows):")
+            print(frame.head(10).to_string(index=False))
+        return
+
+    if args.command == "reparse":
+        count = reparse(args.input, args.workers)
+        print(f"Reparsed {count} profiles in {args.input}")
+        return
+
+    if args.command not in ("daemon", "crawl") and not args.profiles:
+        parser.error("the following arguments are required: --profiles")
+    if args.command in ("daemon", "crawl") and len(args.cookies) > 1:
+        parser.error(f"{args.command} scrapes with a single cookies file")
+
+    configure(args)
+    signal.signal(signal.SIGTERM, terminate)
+    cookies = load_cookies(args.cookies[0])
+
+    if args.command == "daemon":
+        import daemon
+        try:
+            # Partial jobs merge into the profile JSON instead of replacing it
+            asyncio.run(daemon.serve(cookies, args.sections, args.output, args.port, args.concurrency,
+                                     args.parallel_sections, not args.headed, merge=True))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            sinks.close(args.output)
+        report(args)
+        return
+
+    if args.command == "crawl":
+        crawl(args, cookies)
+        return
+
+    jobs = [(profile, args.sections) for profile in args.profiles]
+    merge = args.resume or bool(args.ttl)
+    if merge:
+        state = manifest.read_manifest(args.output)
+        if args.ttl:
+            try:
+                manifest.configure_ttls(args.ttl)
+            except ValueError as e:
+                parser.error(str(e))
+            jobs = [(profile, manifest.stale(state, profile, sections)) for profile, sections in jobs]
+        else:
+            jobs = [(profile, manifest.pending(state, profile, sections)) for profile, sections in jobs]
+        skipped = sum(1 for _, sections in jobs if not sections)
+        jobs = [job for job in jobs if job[1]]
+        print(f"{skipped} profiles up to date, {len(jobs)} to scrape ({sum(len(s) for _, s in jobs)} sections)")
+
+    if len(args.cookies) > 1:
+        import shard
+        try:
+            failed = shard.run(args, jobs, merge)
+        finally:
+            sinks.close(args.output)
+        if failed:
+            raise SystemExit(f"{failed} shards failed")
+        return
 
-        context.close()
-        browser.close()
+    scrape_jobs(args, cookies, jobs, merge)
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    except writer.WriteFailed as e:
+        raise SystemExit(f"Output incomplete: {e}")
@@ -0,0 +1,16 @@
+import importlib
+
+SECTIONS = [
+    "main",
+    "experience",
+    "education",
+    "certifications",
+    "skills",
+    "recommendations",
+    "publications",
+    "patents"
+]
+
+
+def load(section):
+    return importlib.import_module(f"{__name__}.{section}")
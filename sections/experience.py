@@ -1,8 +1,10 @@
 import re
-from bs4 import BeautifulSoup
-from datetime import datetime
+from datetime import date, datetime
 from collections import defaultdict
-from pathlib import Path
+from api import by_type, date_range, month_year, ref
+from dom import parsed
+from fetch import fetch_section
+from specs import CAPTION, spec, text, items, capture_items, clean_dict
 
 def parse_duration_string(duration_str):
     if not duration_str:
@@ -25,119 +27,117 @@ def format_duration(months_total):
         parts.append(f"{months} mo{'s' if months > 1 else ''}")
     return " ".join(parts) if parts else None
 
-def clean_dict(d):
-    return {k: v for k, v in d.items() if v is not None}
+DATE_RANGE = re.compile(r"([A-Za-z]+\s\d{4}|\d{4})\s*[-to]+\s*(Present|[A-Za-z]+\s\d{4}|\d{4})")
+DURATION = re.compile(r"\u00b7\s*(.+)")
+# A caption in the company slot means the item is not a role
+NOT_A_COMPANY = re.compile(r"\d{4}.*\u00b7.*")
+
+ROLE_FIELDS = {
+    "title": text("div.t-bold span[aria-hidden='true']"),
+    "dates": text(CAPTION),
+    "description": text("div.t-14.t-normal.t-black span[aria-hidden='true']", " ")
+}
+
+SPEC = spec({
+    # Roles grouped under one company, with the company as the item's header
+    "company": text("div.t-bold span[aria-hidden='true']"),
+    "sub_roles": items("li.pvs-list__item--one-column", ROLE_FIELDS),
+    # A single role
+    "title": text("div.hoverable-link-text.t-bold span[aria-hidden='true']"),
+    "company_line": text("span.t-14.t-normal > span[aria-hidden='true']"),
+    "dates": text(CAPTION),
+    "description": text("div.t-14.t-normal.t-black span[aria-hidden='true']", " ")
+})
+
+
+def make_role(title, company, date_text, description):
+    start_date = end_date = duration = None
+    if date_text:
+        date_match = DATE_RANGE.search(date_text)
+        duration_match = DURATION.search(date_text)
+        if date_match:
+            start_date = date_match.group(1).strip()
+            end_date = date_match.group(2).strip()
+        if duration_match:
+            duration = duration_match.group(1).strip()
+
+    return clean_dict({
+        "title": title,
+        "company": company,
+        "start_date": start_date,
+        "end_date": end_date,
+        "duration": duration,
+        "description": description
+    })
+
+
+def parse_date_safe(date_str):
+    try:
+        return datetime.strptime(date_str, "%b %Y")
+    except:
+        try:
+            return datetime.strptime(date_str, "%Y")
+        except:
+            return None
 
-def parse(context, profile, output_dir):
-    section = "experience"
-    url = f"https://www.linkedin.com/in/{profile}/details/{section}/"
 
+def parse(context, profile, output_dir):
     page = context.pages[0] if context.pages else context.new_page()
-    page.goto(url)
-    page.wait_for_timeout(5000)
-
-    content = page.query_selector("main")
-    if not content:
-        return None
-    html = content.inner_html()
+    return fetch_section(page, profile, "experience", output_dir)
 
-    with open(Path(output_dir) / f"{profile}.{section}.html", "w", encoding="utf-8") as f:
-        f.write(html.strip())
 
-    soup = BeautifulSoup(html, "html.parser")
-    experience_items = soup.select("li.pvs-list__paged-list-item")
+def build(raw_items):
     experiences = []
 
-    for item in experience_items:
-        sub_roles = item.select("li.pvs-list__item--one-column")
-        if sub_roles:
-            company_tag = item.select_one("div.t-bold span[aria-hidden='true']")
-            company = company_tag.get_text(strip=True) if company_tag else None
-
-            for sub in sub_roles:
-                title = start_date = end_date = duration = description = None
-
-                title_tag = sub.select_one("div.t-bold span[aria-hidden='true']")
-                if title_tag:
-                    title = title_tag.get_text(strip=True)
-
-                date_tag = sub.select_one("span.pvs-entity__caption-wrapper[aria-hidden='true']")
-                if date_tag:
-                    date_text = date_tag.get_text(strip=True)
-                    date_match = re.search(r"([A-Za-z]+\s\d{4}|\d{4})\s*[-to]+\s*(Present|[A-Za-z]+\s\d{4}|\d{4})", date_text)
-                    duration_match = re.search(r"\u00b7\s*(.+)", date_text)
-                    if date_match:
-                        start_date = date_match.group(1).strip()
-                        end_date = date_match.group(2).strip()
-                    if duration_match:
-                        duration = duration_match.group(1).strip()
-
-                desc_tag = sub.select_one("div.t-14.t-normal.t-black span[aria-hidden='true']")
-                if desc_tag:
-                    description = desc_tag.get_text(" ", strip=True)
-
-                experiences.append(clean_dict({
-                    "title": title,
-                    "company": company,
-                    "start_date": start_date,
-                    "end_date": end_date,
-                    "duration": duration,
-                    "description": description
-                }))
+    for item in raw_items:
+        if item["sub_roles"]:
+            for sub in item["sub_roles"]:
+                experiences.append(make_role(sub["title"], item["company"], sub["dates"], sub["description"]))
             continue
 
-        title = company = start_date = end_date = duration = description = None
-
-        title_tag = item.select_one("div.hoverable-link-text.t-bold span[aria-hidden='true']")
-        if title_tag:
-            title = title_tag.get_text(strip=True)
-
-        company_tag = item.select_one("span.t-14.t-normal > span[aria-hidden='true']")
-        if company_tag:
-            raw_company = company_tag.get_text(strip=True)
-            if re.match(r"\d{4}.*\u00b7.*", raw_company):
-                continue
-            company = raw_company
-
-        date_tag = item.select_one("span.pvs-entity__caption-wrapper[aria-hidden='true']")
-        if date_tag:
-            date_text = date_tag.get_text(strip=True)
-            date_match = re.search(r"([A-Za-z]+\s\d{4}|\d{4})\s*[-to]+\s*(Present|[A-Za-z]+\s\d{4}|\d{4})", date_text)
-            duration_match = re.search(r"\u00b7\s*(.+)", date_text)
-            if date_match:
-                start_date = date_match.group(1).strip()
-                end_date = date_match.group(2).strip()
-            if duration_match:
-                duration = duration_match.group(1).strip()
-
-        desc_tag = item.select_one("div.t-14.t-normal.t-black span[aria-hidden='true']")
-        if desc_tag:
-            description = desc_tag.get_text(" ", strip=True)
+        company = item["company_line"]
+        if company and NOT_A_COMPANY.match(company):
+            continue
+        experiences.append(make_role(item["title"], company, item["dates"], item["description"]))
+
+    return group_roles(experiences)
+
 
+def decode(profile, entities, index):
+    experiences = []
+    for position in by_type(entities, "Position"):
+        start, end = date_range(position)
+        start_date = month_year(start)
+        end_date = month_year(end) or "Present"
+        months = tenure_months(start, end)
         experiences.append(clean_dict({
-            "title": title,
-            "company": company,
+            "title": position.get("title"),
+            "company": position.get("companyName") or ref(position, "company", index).get("name"),
             "start_date": start_date,
-            "end_date": end_date,
-            "duration": duration,
-            "description": description
+            "end_date": end_date if start_date else None,
+            "duration": format_duration(months) if months else None,
+            "description": position.get("description")
         }))
+    return group_roles(experiences) if experiences else None
 
+
+def tenure_months(start, end):
+    # Counted the way LinkedIn shows it: both end months included
+    if not start or not start.get("year"):
+        return 0
+    if not end or not end.get("year"):
+        today = date.today()
+        end = {"year": today.year, "month": today.month}
+    return (end["year"] - start["year"]) * 12 + (end.get("month") or 1) - (start.get("month") or 1) + 1
+
+
+def group_roles(experiences):
     unique = {}
     for exp in experiences:
         key = (exp.get("title"), exp.get("start_date"))
         if key not in unique:
             unique[key] = exp
 
-    def parse_date_safe(date_str):
-        try:
-            return datetime.strptime(date_str, "%b %Y")
-        except:
-            try:
-                return datetime.strptime(date_str, "%Y")
-            except:
-                return None
-
     grouped_dict = defaultdict(list)
     for role in unique.values():
         company = role.get("company")
@@ -165,3 +165,8 @@ def parse(context, profile, output_dir):
         }))
 
     return grouped_output
+
+
+def extract(html):
+    with parsed(html) as root:
+        return build(capture_items(root, SPEC))
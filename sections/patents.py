@@ -1,58 +1,40 @@
-from bs4 import BeautifulSoup
 import re
-from pathlib import Path
+from dom import parsed
+from fetch import fetch_section
+from specs import spec, text, capture_items, build_records
 
-def clean_dict(d):
-    return {k: v for k, v in d.items() if v is not None}
+ISSUED = re.compile(r"Issued\s+(\w+\s+\d{1,2},\s+\d{4})")
+
+
+def info(text):
+    parts = [p.strip() for p in text.split("·")]
+    if len(parts) != 2:
+        return None
+    patent_number, issued = parts
+    match = ISSUED.search(issued)
+    return {
+        "patent_number": patent_number,
+        "issue_date": match.group(1) if match else None
+    }
+
+
+SPEC = spec({
+    "title": text(".t-bold span[aria-hidden='true']"),
+    "info": text("span.t-14.t-normal span[aria-hidden='true']", post=info),
+    "description": text("div.t-14.t-normal.t-black span[aria-hidden='true']", " ")
+}, skip_empty=True)
 
-def parse(context, profile, output_dir):
-    section = "patents"
-    url = f"https://www.linkedin.com/in/{profile}/details/{section}/"
 
+def parse(context, profile, output_dir):
     page = context.pages[0] if context.pages else context.new_page()
-    page.goto(url)
-    page.wait_for_timeout(5000)
+    return fetch_section(page, profile, "patents", output_dir)
 
-    content = page.query_selector("main")
-    if not content:
-        return None
-    html = content.inner_html()
-
-    with open(Path(output_dir) / f"{profile}.{section}.html", "w", encoding="utf-8") as f:
-        f.write(html.strip())
-
-    soup = BeautifulSoup(html, "html.parser")
-    patents = []
-
-    for item in soup.select("li.pvs-list__paged-list-item"):
-        title = patent_number = issue_date = description = None
-
-        title_tag = item.select_one(".t-bold span[aria-hidden='true']")
-        if title_tag:
-            title = title_tag.get_text(strip=True)
-
-        info_tag = item.select_one("span.t-14.t-normal span[aria-hidden='true']")
-        if info_tag:
-            text = info_tag.get_text(strip=True)
-            parts = [p.strip() for p in text.split("\u00b7")]
-            if len(parts) == 2:
-                patent_number, issued = parts
-                match = re.search(r"Issued\s+(\w+\s+\d{1,2},\s+\d{4})", issued)
-                if match:
-                    issue_date = match.group(1)
-
-        desc_tag = item.select_one("div.t-14.t-normal.t-black span[aria-hidden='true']")
-        if desc_tag:
-            description = desc_tag.get_text(" ", strip=True)
-
-        cleaned = clean_dict({
-            "title": title,
-            "patent_number": patent_number,
-            "issue_date": issue_date,
-            "description": description
-        })
-
-        if cleaned:
-            patents.append(cleaned)
-
-    return patents if patents else None
\ No newline at end of file
+
+def build(raw_items):
+    patents = build_records(raw_items, SPEC)
+    return patents if patents else None
+
+
+def extract(html):
+    with parsed(html) as root:
+        return build(capture_items(root, SPEC))
@@ -1,63 +1,51 @@
-from bs4 import BeautifulSoup
-import re
-from pathlib import Path
+from api import by_type, full_date
+from dom import parsed
+from fetch import fetch_section
+from specs import clean_dict, spec, text, attr, capture_items, build_records
 
-def clean_dict(d):
-    return {k: v for k, v in d.items() if v is not None}
 
-def parse(context, profile, output_dir):
-    section = "publications"
-    url = f"https://www.linkedin.com/in/{profile}/details/{section}/"
-
-    page = context.pages[0] if context.pages else context.new_page()
-    page.goto(url)
-    page.wait_for_timeout(5000)
-
-    content = page.query_selector("main")
-    if not content:
+def info(text):
+    if "·" in text:
+        parts = [p.strip() for p in text.split("·")]
+        if len(parts) == 2:
+            return {"publisher": parts[0], "date": parts[1]}
         return None
-    html = content.inner_html()
+    return {"publisher": text}
 
-    with open(Path(output_dir) / f"{profile}.{section}.html", "w", encoding="utf-8") as f:
-        f.write(html.strip())
 
-    soup = BeautifulSoup(html, "html.parser")
-    publications = []
+SPEC = spec({
+    "title": text(".t-bold span[aria-hidden='true']"),
+    "info": text("span.t-14.t-normal span[aria-hidden='true']", post=info),
+    "url": attr("a[href]", "href"),
+    "description": text("div.t-14.t-normal.t-black span[aria-hidden='true']", " ")
+}, skip_empty=True)
 
-    for item in soup.select("li.pvs-list__paged-list-item"):
-        title = publisher = date = url = description = None
 
-        title_tag = item.select_one(".t-bold span[aria-hidden='true']")
-        if title_tag:
-            title = title_tag.get_text(strip=True)
+def decode(profile, entities, index):
+    publications = []
+    for publication in by_type(entities, "Publication"):
+        cleaned = clean_dict({
+            "title": publication.get("name"),
+            "publisher": publication.get("publisher"),
+            "date": full_date(publication.get("publishedOn") or publication.get("date")),
+            "url": publication.get("url"),
+            "description": publication.get("description")
+        })
+        if cleaned:
+            publications.append(cleaned)
+    return publications
 
-        info_tag = item.select_one("span.t-14.t-normal span[aria-hidden='true']")
-        if info_tag:
-            text = info_tag.get_text(strip=True)
-            if "\u00b7" in text:
-                parts = [p.strip() for p in text.split("\u00b7")]
-                if len(parts) == 2:
-                    publisher, date = parts
-            else:
-                publisher = text
 
-        link_tag = item.select_one("a[href]")
-        if link_tag and link_tag.has_attr("href"):
-            url = link_tag["href"]
+def parse(context, profile, output_dir):
+    page = context.pages[0] if context.pages else context.new_page()
+    return fetch_section(page, profile, "publications", output_dir)
 
-        desc_tag = item.select_one("div.t-14.t-normal.t-black span[aria-hidden='true']")
-        if desc_tag:
-            description = desc_tag.get_text(" ", strip=True)
 
-        cleaned = clean_dict({
-            "title": title,
-            "publisher": publisher,
-            "date": date,
-            "url": url,
-            "description": description
-        })
+def build(raw_items):
+    publications = build_records(raw_items, SPEC)
+    return publications if publications else None
 
-        if cleaned:
-            publications.append(cleaned)
 
-    return publications if publications else None
\ No newline at end of file
+def extract(html):
+    with parsed(html) as root:
+        return build(capture_items(root, SPEC))
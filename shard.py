@@ -0,0 +1,104 @@
+import hashlib
+import multiprocessing
+import queue
+import re
+import signal
+from bisect import bisect
+from pathlib import Path
+import sinks
+
+# Sharded runs: with several --cookies files, profiles are split between the
+# accounts on a consistent-hash ring and each account gets its own worker
+# process and browser. Workers scrape, write snapshots and the manifest, and
+# send finished profiles back to this process, the only one writing the sink.
+# The ring keeps a profile on the same account from run to run, and adding or
+# removing an account only moves the profiles that hashed to it.
+
+REPLICAS = 100
+
+
+def ring_hash(key):
+    return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+
+def build_ring(accounts):
+    return sorted((ring_hash(f"{account}#{i}"), account) for account in accounts for i in range(REPLICAS))
+
+
+def assign(jobs, accounts):
+    ring = build_ring(accounts)
+    points = [point for point, _ in ring]
+    shards = {account: [] for account in accounts}
+    for profile, sections in jobs:
+        _, account = ring[bisect(points, ring_hash(profile)) % len(ring)]
+        shards[account].append((profile, sections))
+    return shards
+
+
+def writer_name(account):
+    # Stable per account across runs, whatever order --cookies lists them in
+    path = Path(account).resolve()
+    stem = re.sub(r"[^A-Za-z0-9_-]+", "_", path.stem)
+    return f"{stem}-{hashlib.md5(str(path).encode('utf-8')).hexdigest()[:8]}"
+
+
+def scrape_shard(args, index, account, jobs, merge, results):
+    import scrape
+    import snapshots
+    scrape.configure(args)
+    signal.signal(signal.SIGTERM, scrape.terminate)
+    scrape.ratelimit.ACCOUNT = account
+    snapshots.WRITER = writer_name(account)
+    sinks.RESULTS = results
+    # Each worker reports its own stage timings
+    for name in ("stats", "trace", "chrome_trace", "prometheus"):
+        if getattr(args, name):
+            setattr(args, name, f"{getattr(args, name)}.{index}")
+    scrape.scrape_jobs(args, scrape.load_cookies(account), jobs, merge)
+
+
+def drain(args, workers, results):
+    written = 0
+    while True:
+        try:
+            profile, profile_json, sections, lines = results.get(timeout=1)
+        except queue.Empty:
+            if not any(worker.is_alive() for worker in workers):
+                return written
+            continue
+        sinks.write(args.output, profile, profile_json, sections, lines)
+        written += 1
+
+
+def run(args, jobs, merge):
+    shards = assign(jobs, args.cookies)
+    for account, shard_jobs in shards.items():
+        print(f"{account}: {len(shard_jobs)} profiles")
+
+    # spawn rather than fork: Playwright's driver threads don't survive a fork
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    workers = [
+        context.Process(target=scrape_shard, args=(args, i, account, shard_jobs, merge, results), name=f"shard-{i}")
+        for i, (account, shard_jobs) in enumerate(shards.items()) if shard_jobs
+    ]
+    for worker in workers:
+        worker.start()
+
+    try:
+        written = drain(args, workers, results)
+    except BaseException:
+        # Stopped early: stop the workers too, keeping what they still send
+        for worker in workers:
+            worker.terminate()
+        drain(args, workers, results)
+        raise
+
+    failed = 0
+    for worker in workers:
+        worker.join()
+        if worker.exitcode:
+            print(f"{worker.name} exited with code {worker.exitcode}")
+            failed += 1
+    print(f"Wrote {written} profiles from {len(workers)} shards")
+    return failed
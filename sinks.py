@@ -0,0 +1,204 @@
+import gzip
+import json
+import sqlite3
+import time
+from pathlib import Path
+from output import hold, write_queued
+from timing import span
+import manifest
+import writer
+
+# Where scraped profiles go, chosen with --sink:
+#   files     one {profile}.json per profile (default)
+#   jsonl     one line per scraped profile appended to profiles.jsonl
+#   jsonl.gz  the same, gzip compressed
+#   sqlite    profiles.db with one table per section
+# The jsonl and sqlite sinks buffer BATCH profiles and write them together;
+# close() flushes the rest at the end of a run. Writes happen on the
+# background writer thread, which also owns the sqlite connection.
+SINK = "files"
+
+SINKS = ["files", "jsonl", "jsonl.gz", "sqlite"]
+
+BATCH = 50
+
+# Set in shard worker processes: profiles go to the parent over this queue
+# and the parent alone writes them to the sink
+RESULTS = None
+
+# Columns of each section's table; every row also gets profile_id and its
+# position in the section. Lists are stored as JSON text.
+TABLES = {
+    "experience": ["company", "start_date", "end_date", "duration"],
+    "education": ["school", "degree", "start_date", "end_date", "activities", "description"],
+    "certifications": ["name", "issuer", "issue_date", "credential_id", "credential_url", "skills"],
+    "skills": ["name", "endorsements", "endorsed_by", "context", "url"],
+    "recommendations": ["name", "headline", "organization", "date", "relationship", "text", "profile_url"],
+    "publications": ["title", "publisher", "date", "url", "description"],
+    "patents": ["title", "patent_number", "issue_date", "description"]
+}
+
+ROLE_COLUMNS = ["company", "title", "start_date", "end_date", "duration", "description"]
+
+PROFILE_COLUMNS = ["name", "headline", "followers", "about"]
+
+SCHEMA = [
+    f"CREATE TABLE IF NOT EXISTS profiles (profile_id TEXT PRIMARY KEY, {', '.join(PROFILE_COLUMNS)}, updated_at REAL, status TEXT)",
+    "CREATE TABLE IF NOT EXISTS sections (profile_id TEXT, section TEXT, data TEXT, updated_at REAL, "
+    "PRIMARY KEY (profile_id, section))",
+    *(
+        f"CREATE TABLE IF NOT EXISTS {table} (profile_id TEXT, position INTEGER, {', '.join(columns)})"
+        for table, columns in TABLES.items()
+    ),
+    f"CREATE TABLE IF NOT EXISTS experience_roles (profile_id TEXT, position INTEGER, role INTEGER, {', '.join(ROLE_COLUMNS)})",
+    *(f"CREATE INDEX IF NOT EXISTS {table}_profile ON {table} (profile_id)" for table in [*TABLES, "experience_roles"]),
+    "CREATE INDEX IF NOT EXISTS experience_company ON experience (company)",
+    "CREATE INDEX IF NOT EXISTS experience_roles_company ON experience_roles (company)"
+]
+
+pending = []
+
+# Manifest lines of the pending profiles, written after them
+pending_lines = []
+
+connections = {}
+
+
+def column(value):
+    return json.dumps(value, ensure_ascii=False) if isinstance(value, (list, dict)) else value
+
+
+def jsonl_path(output_dir):
+    return Path(output_dir) / f"profiles.{SINK}"
+
+
+def write_jsonl(output_dir, batch):
+    lines = "".join(
+        json.dumps({"profile": profile, "time": t, "sections": sections, "data": profile_json}, ensure_ascii=False) + "\n"
+        for profile, profile_json, sections, t in batch
+    )
+    if SINK == "jsonl.gz":
+        # Each batch becomes one gzip member; readers see a single stream
+        with gzip.open(jsonl_path(output_dir), "at", encoding="utf-8") as f:
+            f.write(lines)
+    else:
+        with open(jsonl_path(output_dir), "a", encoding="utf-8") as f:
+            f.write(lines)
+    return jsonl_path(output_dir)
+
+
+def connect(output_dir):
+    key = str(output_dir)
+    if key not in connections:
+        db = sqlite3.connect(Path(output_dir) / "profiles.db")
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        for statement in SCHEMA:
+            db.execute(statement)
+        # Databases written before profiles had a status
+        if "status" not in [row[1] for row in db.execute("PRAGMA table_info(profiles)")]:
+            db.execute("ALTER TABLE profiles ADD COLUMN status TEXT")
+        db.commit()
+        connections[key] = db
+    return connections[key]
+
+
+def section_rows(profile, section, records):
+    columns = TABLES[section]
+    rows = [(profile, i, *(column(record.get(c)) for c in columns)) for i, record in enumerate(records)]
+    roles = []
+    if section == "experience":
+        for i, record in enumerate(records):
+            for j, role in enumerate(record.get("roles", [])):
+                role = {"company": record.get("company"), **role}
+                roles.append((profile, i, j, *(column(role.get(c)) for c in ROLE_COLUMNS)))
+    return rows, roles
+
+
+def write_sqlite(output_dir, batch):
+    db = connect(output_dir)
+    with db:
+        for profile, profile_json, sections, t in batch:
+            # A "not_found" profile keeps its rows and gets the status
+            db.execute("INSERT INTO profiles (profile_id, status, updated_at) VALUES (?, ?, ?) ON CONFLICT (profile_id) "
+                       "DO UPDATE SET status = excluded.status, updated_at = excluded.updated_at",
+                       (profile, profile_json.get("status"), t))
+            # Settled sections missing from profile_json came back empty
+            for section in sections:
+                data = profile_json.get(section)
+                if data is None:
+                    db.execute("DELETE FROM sections WHERE profile_id = ? AND section = ?", (profile, section))
+                else:
+                    db.execute("INSERT INTO sections VALUES (?, ?, ?, ?) ON CONFLICT (profile_id, section) "
+                               "DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at",
+                               (profile, section, json.dumps(data, ensure_ascii=False), t))
+
+                if section == "main":
+                    main = data or {}
+                    db.execute(
+                        f"INSERT INTO profiles (profile_id, {', '.join(PROFILE_COLUMNS)}, updated_at) "
+                        f"VALUES (?, {', '.join('?' for _ in PROFILE_COLUMNS)}, ?) "
+                        f"ON CONFLICT (profile_id) DO UPDATE SET "
+                        f"{', '.join(f'{c} = excluded.{c}' for c in PROFILE_COLUMNS)}, updated_at = excluded.updated_at",
+                        (profile, *(main.get(c) for c in PROFILE_COLUMNS), t)
+                    )
+                elif section in TABLES:
+                    db.execute(f"DELETE FROM {section} WHERE profile_id = ?", (profile,))
+                    rows, roles = section_rows(profile, section, data or [])
+                    if rows:
+                        db.executemany(f"INSERT INTO {section} VALUES ({', '.join('?' for _ in rows[0])})", rows)
+                    if section == "experience":
+                        db.execute("DELETE FROM experience_roles WHERE profile_id = ?", (profile,))
+                        if roles:
+                            db.executemany(f"INSERT INTO experience_roles VALUES ({', '.join('?' for _ in roles[0])})", roles)
+
+
+def write_file(output_dir, profile, profile_json, lines):
+    with span("write", profile):
+        return [write_queued(output_dir, profile, profile_json), manifest.append(output_dir, lines)]
+
+
+def write_batch(output_dir, batch, lines):
+    with span("write"):
+        path = write_sqlite(output_dir, batch) if SINK == "sqlite" else write_jsonl(output_dir, batch)
+        return [path, manifest.append(output_dir, lines)]
+
+
+def flush(output_dir):
+    if not pending:
+        return
+    batch = pending[:]
+    lines = pending_lines[:]
+    pending.clear()
+    pending_lines.clear()
+    writer.submit(write_batch, output_dir, batch, lines)
+
+
+def write(output_dir, profile, profile_json, sections, lines=()):
+    # sections are the ones that came back ok or empty this time; the others
+    # in profile_json were merged from an earlier run or failed and keep
+    # what the sink already has. lines are the profile's manifest
+    # entries, written once the profile is
+    if RESULTS is not None:
+        RESULTS.put((profile, profile_json, list(sections), list(lines)))
+        return
+    if SINK == "files":
+        hold(output_dir, profile, profile_json)
+        writer.submit(write_file, output_dir, profile, profile_json, list(lines))
+        return
+    pending.append((profile, profile_json, list(sections), round(time.time(), 3)))
+    pending_lines.extend(lines)
+    if len(pending) >= BATCH:
+        flush(output_dir)
+
+
+def disconnect(output_dir):
+    db = connections.pop(str(output_dir), None)
+    if db:
+        db.close()
+
+
+def close(output_dir):
+    flush(output_dir)
+    writer.submit(disconnect, output_dir)
+    writer.flush()
@@ -0,0 +1,191 @@
+import gzip
+import hashlib
+import json
+import os
+import time
+from collections import defaultdict
+from pathlib import Path
+from sections import SECTIONS
+
+# Section HTML snapshots, either as plain {profile}.{section}.html files or in
+# a content-addressed store under snapshots/ in the output directory. The
+# store compresses each distinct page once (zstd when the zstandard package is
+# installed, gzip otherwise) and appends it to a packed segment file;
+# index.jsonl records where every blob lives and which blob each
+# profile/section last pointed at, so identical pages are stored only once.
+# Ref entries carry the time they were written and the newest one wins, since
+# refs to the same section can sit in several writers' index files.
+FORMAT = "files"
+
+FORMATS = ["files", "store"]
+
+STORE_DIR = "snapshots"
+
+SEGMENT_BYTES = 64 * 1024 * 1024
+
+ZSTD_LEVEL = 9
+
+# Set per process when several write to one store (sharded runs); each
+# writer appends to its own segments and index file
+WRITER = ""
+
+# Loaded store indexes per directory, kept current by writes
+stores = {}
+
+
+def compress(data):
+    try:
+        import zstandard
+    except ImportError:
+        return "gzip", gzip.compress(data, compresslevel=6)
+    return "zstd", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+
+
+def decompress(codec, data):
+    if codec == "zstd":
+        import zstandard
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def store_dir(output_dir):
+    return Path(output_dir) / STORE_DIR
+
+
+def load_store(output_dir):
+    key = str(output_dir)
+    if key in stores:
+        return stores[key]
+    store = {"blobs": {}, "refs": {}, "segment": 0}
+    written = {}
+    for path in sorted(store_dir(output_dir).glob("index*.jsonl")):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Last line cut short by a crash
+                    continue
+                if "snapshot" in entry:
+                    ref = (entry["profile"], entry["section"])
+                    # Entries from before refs were timed count as oldest
+                    if entry.get("time", 0) >= written.get(ref, 0):
+                        store["refs"][ref] = entry["hash"]
+                        written[ref] = entry.get("time", 0)
+                else:
+                    store["blobs"][entry["hash"]] = entry
+                    if entry.get("writer", "") == WRITER:
+                        store["segment"] = max(store["segment"], entry["segment"])
+    stores[key] = store
+    return store
+
+
+def segment_path(output_dir, segment, writer=""):
+    return store_dir(output_dir) / f"segment{'-' + writer if writer else ''}-{segment:05d}.pack"
+
+
+def append_index(output_dir, entry):
+    name = f"index-{WRITER}.jsonl" if WRITER else "index.jsonl"
+    path = store_dir(output_dir) / name
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
+    return path
+
+
+def put(output_dir, profile, section, html):
+    # Returns the files it appended to
+    store = load_store(output_dir)
+    written = []
+    data = html.encode("utf-8")
+    digest = hashlib.sha256(data).hexdigest()
+
+    if digest not in store["blobs"]:
+        store_dir(output_dir).mkdir(parents=True, exist_ok=True)
+        codec, blob = compress(data)
+        path = segment_path(output_dir, store["segment"], WRITER)
+        if path.exists() and path.stat().st_size + len(blob) > SEGMENT_BYTES:
+            store["segment"] += 1
+            path = segment_path(output_dir, store["segment"], WRITER)
+        with open(path, "ab") as f:
+            offset = f.seek(0, os.SEEK_END)
+            f.write(blob)
+        entry = {"hash": digest, "segment": store["segment"], "offset": offset, "length": len(blob), "codec": codec}
+        if WRITER:
+            entry["writer"] = WRITER
+        store["blobs"][digest] = entry
+        written += [path, append_index(output_dir, entry)]
+
+    if store["refs"].get((profile, section)) != digest:
+        store["refs"][(profile, section)] = digest
+        written.append(append_index(output_dir, {"snapshot": f"{profile}.{section}", "profile": profile,
+                                                 "section": section, "hash": digest, "time": time.time()}))
+    return written
+
+
+def write_snapshot(output_dir, profile, section, html):
+    if FORMAT == "store":
+        return put(output_dir, profile, section, html)
+    path = Path(output_dir) / f"{profile}.{section}.html"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(html)
+    return path
+
+
+def find_snapshots(input_dir):
+    # {profile: {section: location}} over both layouts; a location is the
+    # .html path or the store's blob entry, and is what read_snapshot takes.
+    # Store entries win over stray files of the same section.
+    snapshots = defaultdict(dict)
+    for path in Path(input_dir).glob("*.html"):
+        profile, _, section = path.stem.rpartition(".")
+        if profile and section in SECTIONS:
+            snapshots[profile][section] = path
+    if store_dir(input_dir).exists():
+        store = load_store(input_dir)
+        for (profile, section), digest in store["refs"].items():
+            if section in SECTIONS:
+                snapshots[profile][section] = store["blobs"][digest]
+    return snapshots
+
+
+def read_snapshot(input_dir, location):
+    if isinstance(location, dict):
+        with open(segment_path(input_dir, location["segment"], location.get("writer", "")), "rb") as f:
+            f.seek(location["offset"])
+            data = f.read(location["length"])
+        return decompress(location["codec"], data).decode("utf-8")
+    with open(location, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def load_snapshot(input_dir, profile, section):
+    if store_dir(input_dir).exists():
+        store = load_store(input_dir)
+        digest = store["refs"].get((profile, section))
+        if digest:
+            return read_snapshot(input_dir, store["blobs"][digest])
+    path = Path(input_dir) / f"{profile}.{section}.html"
+    return read_snapshot(input_dir, path) if path.exists() else None
+
+
+def iter_snapshots(input_dir):
+    # (profile, section, html) for every snapshot, store blobs in segment
+    # order so reads stream through each pack file
+    snapshots = find_snapshots(input_dir)
+    located = [(profile, section, location) for profile, paths in snapshots.items() for section, location in paths.items()]
+    located.sort(key=lambda s: (s[2].get("writer", ""), s[2]["segment"], s[2]["offset"]) if isinstance(s[2], dict) else ("", -1, 0))
+    for profile, section, location in located:
+        yield profile, section, read_snapshot(input_dir, location)
+
+
+def pack(input_dir):
+    # Move plain .html snapshots into the store
+    packed = 0
+    for path in sorted(Path(input_dir).glob("*.html")):
+        profile, _, section = path.stem.rpartition(".")
+        if not profile or section not in SECTIONS:
+            continue
+        put(input_dir, profile, section, read_snapshot(input_dir, path))
+        path.unlink()
+        packed += 1
+    return packed
@@ -0,0 +1,223 @@
+import re
+
+# Section extraction driven by field specs. A spec names the item selector and
+# an ordered set of fields. Each field captures raw text or an attribute from
+# the item with a CSS selector, then an optional regex and post-processor turn
+# that into the output value. A post-processor may return a dict, whose keys
+# are spliced into the record in place of the field.
+#
+# Capturing only needs the selectors, so it runs either over a parsed tree
+# (capture_items) or as JavaScript inside the page (CAPTURE_JS) and yields the
+# same raw values, which build_records then finishes in Python.
+
+ITEM_SELECTOR = "li.pvs-list__paged-list-item"
+
+CAPTION = "span.pvs-entity__caption-wrapper[aria-hidden='true']"
+
+
+def clean_dict(d):
+    return {k: v for k, v in d.items() if v is not None}
+
+
+def text(selector, separator="", regex=None, group=1, post=None):
+    return {"kind": "text", "selector": selector, "separator": separator, "regex": regex, "group": group, "post": post}
+
+
+def texts(selector, separator="", post=None):
+    return {"kind": "texts", "selector": selector, "separator": separator, "regex": None, "post": post}
+
+
+def attr(selector, name, post=None):
+    return {"kind": "attr", "selector": selector, "name": name, "regex": None, "post": post}
+
+
+def parent_text(selector, pattern, separator="", post=None):
+    # Text of the parent of the first match whose own string matches pattern
+    return {"kind": "parent_text", "selector": selector, "pattern": pattern, "separator": separator, "regex": None, "post": post}
+
+
+def items(selector, fields, post=None):
+    # Raw values of nested items, e.g. the roles listed under one company
+    return {"kind": "items", "selector": selector, "spec": spec(fields, items=None), "regex": None, "post": post}
+
+
+def spec(fields, items=ITEM_SELECTOR, skip_empty=False):
+    # Fields sharing a selector are served from one select() per item, and
+    # select_one() is used where every field only needs the first match.
+    # items=None captures the root itself as the only item.
+    groups = {}
+    for name, field in fields.items():
+        groups.setdefault(field["selector"], []).append((name, field))
+    compiled = {
+        "items": items,
+        "fields": fields,
+        "groups": [
+            (selector, all(f["kind"] in ("text", "attr") for _, f in group), group)
+            for selector, group in groups.items()
+        ],
+        "skip_empty": skip_empty
+    }
+    compiled["browser"] = browser_spec(compiled)
+    return compiled
+
+
+def capture(field, nodes):
+    kind = field["kind"]
+    if kind == "texts":
+        return [node.get_text(field["separator"], strip=True) for node in nodes]
+    if kind == "items":
+        return [capture_item(node, field["spec"]) for node in nodes]
+    if kind == "parent_text":
+        for node in nodes:
+            string = node.string
+            if string and field["pattern"].search(string):
+                return node.find_parent().get_text(field["separator"], strip=True)
+        return None
+    if not nodes:
+        return None
+    if kind == "attr":
+        return nodes[0][field["name"]] if nodes[0].has_attr(field["name"]) else None
+    return nodes[0].get_text(field["separator"], strip=True)
+
+
+def finish(field, value):
+    if value is None:
+        return None
+    if field["regex"]:
+        match = field["regex"].search(value)
+        if not match:
+            return None
+        value = match.group(field["group"]) if field["group"] is not None else match
+    if field["post"]:
+        value = field["post"](value)
+    return value
+
+
+def capture_item(item, spec):
+    values = {}
+    for selector, first_only, fields in spec["groups"]:
+        if first_only:
+            node = item.select_one(selector)
+            nodes = [node] if node else []
+        else:
+            nodes = item.select(selector)
+        for name, field in fields:
+            values[name] = capture(field, nodes)
+    return values
+
+
+def capture_items(root, spec):
+    if spec["items"] is None:
+        return [capture_item(root, spec)]
+    return [capture_item(item, spec) for item in root.select(spec["items"])]
+
+
+def build_record(values, spec):
+    record = {}
+    for name, field in spec["fields"].items():
+        value = finish(field, values[name])
+        if isinstance(value, dict):
+            record.update(value)
+        else:
+            record[name] = value
+    return clean_dict(record)
+
+
+def build_records(raw_items, spec):
+    records = []
+    for values in raw_items:
+        record = build_record(values, spec)
+        if record or not spec["skip_empty"]:
+            records.append(record)
+    return records
+
+
+def browser_field(field):
+    kind = field["kind"]
+    js = {"kind": kind}
+    if kind in ("text", "texts", "parent_text"):
+        js["separator"] = field["separator"]
+    if kind == "attr":
+        js["name"] = field["name"]
+    if kind == "parent_text":
+        js["pattern"] = field["pattern"].pattern
+        js["flags"] = "i" if field["pattern"].flags & re.IGNORECASE else ""
+    if kind == "items":
+        js["spec"] = field["spec"]["browser"]
+    return js
+
+
+def browser_spec(spec):
+    return {
+        "items": spec["items"],
+        "groups": [
+            [selector, first_only, [[name, browser_field(field)] for name, field in fields]]
+            for selector, first_only, fields in spec["groups"]
+        ]
+    }
+
+
+# Same capture as capture_items, with get_text(strip=True) and .string
+# following BeautifulSoup: stripped text nodes joined by the separator,
+# skipping empty ones and anything under script, style or template
+CAPTURE_JS = """
+([rootSelector, spec]) => {
+    const SKIP = new Set(["SCRIPT", "STYLE", "TEMPLATE"]);
+
+    const strings = (node, out) => {
+        for (const child of node.childNodes) {
+            if (child.nodeType === Node.TEXT_NODE) out.push(child.nodeValue);
+            else if (child.nodeType === Node.ELEMENT_NODE && !SKIP.has(child.tagName)) strings(child, out);
+        }
+        return out;
+    };
+    const getText = (node, separator) =>
+        strings(node, []).map(s => s.trim()).filter(s => s).join(separator);
+    const ownString = (node) => {
+        while (node.childNodes.length === 1) {
+            node = node.firstChild;
+            if (node.nodeType !== Node.ELEMENT_NODE) return node.nodeValue;
+        }
+        return null;
+    };
+
+    const capture = (field, nodes) => {
+        switch (field.kind) {
+            case "texts":
+                return nodes.map(n => getText(n, field.separator));
+            case "items":
+                return nodes.map(n => captureItem(n, field.spec));
+            case "parent_text": {
+                const pattern = new RegExp(field.pattern, field.flags);
+                for (const n of nodes) {
+                    const s = ownString(n);
+                    if (s && pattern.test(s)) return getText(n.parentNode, field.separator);
+                }
+                return null;
+            }
+        }
+        if (!nodes.length) return null;
+        if (field.kind === "attr") return nodes[0].hasAttribute(field.name) ? nodes[0].getAttribute(field.name) : null;
+        return getText(nodes[0], field.separator);
+    };
+    const captureItem = (item, spec) => {
+        const values = {};
+        for (const [selector, firstOnly, fields] of spec.groups) {
+            let nodes;
+            if (firstOnly) {
+                const node = item.querySelector(selector);
+                nodes = node ? [node] : [];
+            } else {
+                nodes = Array.from(item.querySelectorAll(selector));
+            }
+            for (const [name, field] of fields) values[name] = capture(field, nodes);
+        }
+        return values;
+    };
+
+    const root = rootSelector ? document.querySelector(rootSelector) : document;
+    if (!root) return null;
+    if (spec.items === null) return [captureItem(root, spec)];
+    return Array.from(root.querySelectorAll(spec.items)).map(item => captureItem(item, spec));
+}
+"""
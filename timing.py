@@ -0,0 +1,179 @@
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from itertools import count
+
+# Spans around every stage of fetching a section, tagged with the profile and
+# section being worked on. Stages:
+#   section    the whole fetch_section call
+#   navigate   page.goto, including rate-limit pacing and retries
+#   ready      readiness wait
+#   expand     clicking "see more" and waiting for it to go
+#   serialize  reading the HTML out of the page
+#   capture    running the field specs in the page (--extract browser)
+#   payloads   reading captured API responses, decode building from them
+#   hash       hashing the snapshot for the memo
+#   snapshot   writing the snapshot, on the background writer
+#   extract    parser work for a section; includes parse, the HTML parse
+#   write      writing profiles to the sink, on the background writer
+# Exported with --stats (section times), --trace (JSONL), --chrome-trace
+# (trace-event JSON for chrome://tracing or Perfetto) and --prometheus
+# (textfile collector format).
+
+spans = []
+
+# Per stage: count, total seconds, counts per histogram bucket and a
+# fixed-size random sample of durations for the percentiles. Kept even when
+# the spans themselves are not, which --stats, --trace and --chrome-trace
+# need and long runs can't afford
+stages = {}
+
+SAMPLE_SIZE = 4096
+
+KEEP_SPANS = True
+
+# add() runs on the scraping thread and the background writer
+lock = threading.Lock()
+
+# (profile, section, lane) of the section fetch running in this thread or
+# task; each fetch gets its own lane, a row in the Chrome trace. Spans
+# outside a fetch, the background writer's, go in lane 0
+current = ContextVar("current", default=(None, None, 0))
+
+lanes = count(1)
+
+ORIGIN = time.perf_counter()
+
+BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30]
+
+QUANTILES = [0.5, 0.9, 0.99]
+
+
+def observe(stage, elapsed):
+    with lock:
+        stats = stages.setdefault(stage, {"count": 0, "sum": 0.0, "buckets": [0] * len(BUCKETS), "sample": []})
+        stats["count"] += 1
+        stats["sum"] += elapsed
+        for i, le in enumerate(BUCKETS):
+            if elapsed <= le:
+                stats["buckets"][i] += 1
+        # Reservoir sampling: every duration so far is equally likely to be kept
+        if len(stats["sample"]) < SAMPLE_SIZE:
+            stats["sample"].append(elapsed)
+        else:
+            i = random.randrange(stats["count"])
+            if i < SAMPLE_SIZE:
+                stats["sample"][i] = elapsed
+
+
+def add(stage, start, profile=None, section=None):
+    elapsed = time.perf_counter() - start
+    observe(stage, elapsed)
+    if not KEEP_SPANS:
+        return
+    tag_profile, tag_section, lane = current.get()
+    spans.append({
+        "stage": stage,
+        "profile": profile or tag_profile,
+        "section": section or tag_section,
+        "start": start,
+        "ms": round(elapsed * 1000, 3),
+        "lane": lane
+    })
+
+
+@contextmanager
+def span(stage, profile=None, section=None):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add(stage, start, profile, section)
+
+
+@contextmanager
+def section_span(profile, section):
+    token = current.set((profile, section, next(lanes)))
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add("section", start)
+        current.reset(token)
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def write_stats(path):
+    with open(path, "w", encoding="utf-8") as f:
+        for s in spans:
+            if s["stage"] == "section":
+                f.write(json.dumps({"profile": s["profile"], "section": s["section"], "ms": round(s["ms"], 1)}) + "\n")
+
+
+def write_trace(path):
+    with open(path, "w", encoding="utf-8") as f:
+        for s in spans:
+            f.write(json.dumps({**s, "start": round((s["start"] - ORIGIN) * 1000, 3)}) + "\n")
+
+
+def write_chrome_trace(path):
+    pid = os.getpid()
+    events = [
+        {
+            "name": s["stage"],
+            "cat": s["section"] or "profile",
+            "ph": "X",
+            "ts": round((s["start"] - ORIGIN) * 1e6),
+            "dur": round(s["ms"] * 1000),
+            "pid": pid,
+            "tid": s["lane"],
+            "args": {"profile": s["profile"], "section": s["section"]}
+        }
+        for s in spans
+    ]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+def write_prometheus(path):
+    lines = [
+        "# HELP li_scraper_stage_seconds Time spent in each scraping stage.",
+        "# TYPE li_scraper_stage_seconds histogram"
+    ]
+    for stage, stats in stages.items():
+        for le, n in zip(BUCKETS, stats["buckets"]):
+            lines.append(f'li_scraper_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {n}')
+        lines.append(f'li_scraper_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {stats["count"]}')
+        lines.append(f'li_scraper_stage_seconds_sum{{stage="{stage}"}} {stats["sum"]:.6f}')
+        lines.append(f'li_scraper_stage_seconds_count{{stage="{stage}"}} {stats["count"]}')
+    lines += [
+        "# HELP li_scraper_stage_quantile_seconds Percentiles of the time spent in each scraping stage.",
+        "# TYPE li_scraper_stage_quantile_seconds summary"
+    ]
+    for stage, stats in stages.items():
+        for q in QUANTILES:
+            lines.append(f'li_scraper_stage_quantile_seconds{{stage="{stage}",quantile="{q}"}} {percentile(stats["sample"], q):.6f}')
+        lines.append(f'li_scraper_stage_quantile_seconds_sum{{stage="{stage}"}} {stats["sum"]:.6f}')
+        lines.append(f'li_scraper_stage_quantile_seconds_count{{stage="{stage}"}} {stats["count"]}')
+    # Written whole and renamed, so the collector never reads half a file
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp, path)
+
+
+def summary():
+    if not stages:
+        return "No stages recorded"
+    return ", ".join(
+        f"{stage} {s['count']}x p50 {percentile(s['sample'], 0.5) * 1000:.0f} ms p90 {percentile(s['sample'], 0.9) * 1000:.0f} ms"
+        for stage, s in stages.items()
+    )
@@ -0,0 +1,149 @@
+import atexit
+import os
+import queue
+import threading
+import time
+
+# Disk writes (snapshots, profile JSON, memo and manifest lines) run on one
+# background thread, in the order they were submitted, so the browser never
+# waits on storage. The queue is bounded: when the disk falls behind,
+# submit() blocks until there is room again. Written files are fsynced in
+# batches of FSYNC_EVERY writes (0: left to the OS), or FSYNC_INTERVAL_S
+# after the last one. flush() waits for everything queued so far and raises
+# WriteFailed if a write failed since the last flush; it also runs at exit.
+# With ENABLED off every write happens inline.
+ENABLED = True
+
+QUEUE_SIZE = 256
+
+FSYNC_EVERY = 64
+
+FSYNC_INTERVAL_S = 5
+
+tasks = None
+
+thread = None
+
+dirty = set()
+
+stats = {"writes": 0, "fsyncs": 0, "failed": 0, "blocked_s": 0.0}
+
+# First write that failed since the last flush
+error = None
+
+
+class WriteFailed(Exception):
+    pass
+
+
+def fsync_dirty():
+    if not FSYNC_EVERY:
+        dirty.clear()
+        return
+    for path in dirty:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    stats["fsyncs"] += len(dirty)
+    dirty.clear()
+
+
+def run(fn, args):
+    global error
+    try:
+        path = fn(*args)
+    except Exception as e:
+        stats["failed"] += 1
+        print(f"Background write {fn.__name__} failed: {e!r}")
+        error = error or e
+        return
+    stats["writes"] += 1
+    if isinstance(path, list):
+        dirty.update(str(p) for p in path if p)
+    elif path:
+        dirty.add(str(path))
+
+
+def loop():
+    while True:
+        try:
+            task = tasks.get(timeout=FSYNC_INTERVAL_S)
+        except queue.Empty:
+            fsync_dirty()
+            continue
+        try:
+            if task is None:
+                fsync_dirty()
+                return
+            fn, args, done = task
+            if fn:
+                run(fn, args)
+            if done or (FSYNC_EVERY and len(dirty) >= FSYNC_EVERY):
+                fsync_dirty()
+            if done:
+                done.set()
+        finally:
+            tasks.task_done()
+
+
+def start():
+    global tasks, thread
+    tasks = queue.Queue(maxsize=QUEUE_SIZE)
+    thread = threading.Thread(target=loop, name="writer", daemon=True)
+    thread.start()
+    atexit.register(stop)
+
+
+def submit(fn, *args):
+    # fn does the write and returns the path or list of paths it wrote, to
+    # be fsynced, or None
+    if not ENABLED:
+        fn(*args)
+        return
+    if thread is None:
+        start()
+    start_wait = time.perf_counter()
+    tasks.put((fn, args, None))
+    stats["blocked_s"] += time.perf_counter() - start_wait
+
+
+def check():
+    global error
+    if error:
+        failed, error = error, None
+        raise WriteFailed(f"{stats['failed']} background writes failed, first: {failed!r}") from failed
+
+
+def flush():
+    if thread is None or not thread.is_alive():
+        return
+    done = threading.Event()
+    tasks.put((None, None, done))
+    done.wait()
+    check()
+
+
+def stop():
+    global thread
+    if thread is None or not thread.is_alive():
+        return
+    try:
+        flush()
+    finally:
+        tasks.put(None)
+        thread.join()
+        thread = None
+
+
+def summary():
+    if not stats["writes"] and not stats["failed"]:
+        return "No background writes"
+    return (
+        f"{stats['writes']} writes, {stats['fsyncs']} fsyncs, {stats['failed']} failed, "
+        f"{stats['blocked_s']:.1f}s blocked on a full queue"
+    )